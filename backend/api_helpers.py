@@ -0,0 +1,46 @@
+"""Shared HTTP helpers for the backend test scripts."""
+import json
+import time
+
+import requests
+
+API = "http://9.30.147.112:8000/api"
+
+# Shared keep-alive session so sequential calls reuse one connection
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=16, max_retries=0))
+SESSION.headers["Connection"] = "keep-alive"
+
+
+def wait_for_default(model_id, timeout=5.0, interval=0.1):
+    """Poll until the server reports model_id as the default model."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        resp = SESSION.get(f"{API}/connections/models", timeout=10)
+        if any(m.get("is_default") and m.get("model_id") == model_id for m in resp.json()):
+            return True
+        time.sleep(interval)
+    return False
+
+
+def stream_chat(message, timeout=120):
+    """Send a message to the streaming chat endpoint and return the reply text.
+
+    Raises RuntimeError on HTTP or agent errors.
+    """
+    content = ""
+    with SESSION.post(f"{API}/chat/stream", json={"message": message},
+                      stream=True, timeout=(5, timeout)) as resp:
+        if resp.status_code != 200:
+            raise RuntimeError(f"HTTP {resp.status_code}: {resp.text[:100]}")
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event["type"] == "error":
+                raise RuntimeError(event["content"])
+            if event["type"] == "done":
+                break
+            if event["type"] == "message":
+                content += event["content"]
+    return content
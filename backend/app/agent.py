@@ -11,8 +11,11 @@ This is our own lightweight agent that:
 
 import asyncio
 import json
+import os
+import re
 import subprocess
 import sys
+import time
 from typing import Optional, Any
 from dataclasses import dataclass
 import httpx
@@ -52,7 +55,6 @@ class WatsonxLLM:
     
     async def _get_token(self) -> str:
         """Get IAM token, refreshing if needed."""
-        import time
         if self._token and time.time() < self._token_expiry - 60:
             return self._token
         
@@ -168,8 +170,6 @@ When deleting users, use: qradar_delete with endpoint="/staged_config/access/use
     def _parse_tool_call(self, text: str) -> Optional[dict]:
         """Try to parse a tool call from the LLM response."""
         try:
-            import re
-            
             # Method 1: Look for {"tool_call": {...}} pattern
             # Find the start of tool_call JSON
             tool_call_start = text.find('"tool_call"')
@@ -350,7 +350,6 @@ class MCPServerClient:
     
     async def start(self):
         """Start the MCP server process."""
-        import os
         full_env = {**os.environ, **self.env}
         
         self._process = subprocess.Popen(
@@ -1,7 +1,7 @@
 """Application configuration."""
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -36,6 +36,13 @@ class Settings(BaseSettings):
     # Ollama
     ollama_base_url: str = "http://localhost:11434"
     
+    # MCP server health checks ("skip" trusts the stored status; connecting still probes)
+    health_check_method: Literal["head", "get", "skip"] = "head"
+    health_check_connect_timeout: float = 1.0
+    health_check_read_timeout: float = 3.0
+    health_check_retries: int = 2  # Extra attempts when a server answers 503
+    health_check_interval: float = 5.0  # Seconds between background status refreshes
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -5,6 +5,7 @@ Stores all settings in ~/.ibm-mcp/config.json
 
 import json
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -12,6 +13,25 @@ CONFIG_DIR = Path.home() / ".ibm-mcp"
 CONFIG_FILE = CONFIG_DIR / "config.json"
 
 
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Read-only view of the config. Callers must not mutate the dicts."""
+    version: int
+    qradar_connections: tuple[dict, ...]
+    mcp_servers: tuple[dict, ...]
+    llm_models: tuple[dict, ...]
+    # id -> record indexes for O(1) lookups
+    qradar_connections_by_id: dict[str, dict]
+    mcp_servers_by_id: dict[str, dict]
+    llm_models_by_id: dict[str, dict]
+
+
+# Cached snapshot, rebuilt only when the config file changes
+_snapshot: ConfigSnapshot | None = None
+_snapshot_stamp: tuple[int, int] | None = None
+_version = 0
+
+
 def _ensure_config_dir():
     """Create config directory if it doesn't exist."""
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
@@ -31,9 +51,48 @@ def _load_config() -> dict:
 
 def _save_config(config: dict):
     """Save config to file."""
+    global _snapshot
     _ensure_config_dir()
     with open(CONFIG_FILE, "w") as f:
         json.dump(config, f, indent=2)
+    _snapshot = None
+
+
+def _file_stamp() -> tuple[int, int] | None:
+    """Return (mtime_ns, size) of the config file, or None if missing."""
+    try:
+        st = CONFIG_FILE.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_snapshot() -> ConfigSnapshot:
+    """
+    Get the current config snapshot.
+    
+    The file is only re-parsed after a save or an external edit, and each
+    rebuild bumps the version so callers can detect changes with one int compare.
+    """
+    global _snapshot, _snapshot_stamp, _version
+    stamp = _file_stamp()
+    if _snapshot is None or stamp != _snapshot_stamp:
+        config = _load_config()
+        _version += 1
+        connections = tuple(config.get("qradar_connections", []))
+        servers = tuple(config.get("mcp_servers", []))
+        models = tuple(config.get("llm_models", []))
+        _snapshot = ConfigSnapshot(
+            version=_version,
+            qradar_connections=connections,
+            mcp_servers=servers,
+            llm_models=models,
+            qradar_connections_by_id={c["id"]: c for c in connections},
+            mcp_servers_by_id={s["id"]: s for s in servers},
+            llm_models_by_id={m["id"]: m for m in models},
+        )
+        _snapshot_stamp = stamp
+    return _snapshot
 
 
 # ============== QRadar Connections ==============
@@ -79,8 +138,8 @@ def delete_qradar_connection(conn_id: str) -> bool:
 
 def get_qradar_connection(conn_id: str) -> dict | None:
     """Get a specific QRadar connection."""
-    connections = get_qradar_connections()
-    return next((c for c in connections if c["id"] == conn_id), None)
+    conn = get_snapshot().qradar_connections_by_id.get(conn_id)
+    return dict(conn) if conn else None
 
 
 # ============== MCP Servers ==============
@@ -91,6 +150,12 @@ def get_mcp_servers() -> list[dict]:
     return config.get("mcp_servers", [])
 
 
+def get_mcp_server(server_id: str) -> dict | None:
+    """Get a specific MCP server config (a copy - safe to modify)."""
+    server = get_snapshot().mcp_servers_by_id.get(server_id)
+    return dict(server) if server else None
+
+
 def save_mcp_server(server: dict) -> dict:
     """Save an MCP server config."""
     config = _load_config()
@@ -125,6 +190,12 @@ def get_llm_models() -> list[dict]:
     return config.get("llm_models", [])
 
 
+def get_llm_model(model_id: str) -> dict | None:
+    """Get a specific LLM model config."""
+    model = get_snapshot().llm_models_by_id.get(model_id)
+    return dict(model) if model else None
+
+
 def save_llm_model(model: dict) -> dict:
     """Save an LLM model config."""
     config = _load_config()
@@ -148,6 +219,24 @@ def save_llm_model(model: dict) -> dict:
     return model
 
 
+def activate_llm_model(model: dict) -> dict:
+    """Make a model the default, adding it first if no config has its model_id."""
+    config = _load_config()
+    models = config.get("llm_models", [])
+    
+    target = next((m for m in models if m.get("model_id") == model.get("model_id")), None)
+    if target is None:
+        target = model
+        models.append(target)
+    
+    for m in models:
+        m["is_default"] = m is target
+    
+    config["llm_models"] = models
+    _save_config(config)
+    return target
+
+
 def delete_llm_model(model_id: str) -> bool:
     """Delete an LLM model config."""
     config = _load_config()
@@ -12,11 +12,18 @@ A proper agentic workflow with:
 
 import json
 import asyncio
+import hashlib
 import logging
+import os
+import re
+import shelve
+import subprocess
+import time
 from typing import TypedDict, Annotated, Literal, AsyncGenerator, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 import operator
+from collections import deque
 
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage, SystemMessage
@@ -62,6 +69,10 @@ class AgentLogger:
         """Log errors."""
         self.logger.error(f"[ERROR] {operation}: {error}")
     
+    def warning(self, operation: str, message: str):
+        """Log recoverable problems."""
+        self.logger.warning(f"[WARN] {operation}: {message}")
+    
     def info(self, message: str):
         """Log general info messages."""
         self.logger.info(f"[INFO] {message}")
@@ -100,6 +111,35 @@ def is_dangerous_operation(message: str, tool_name: str = "", tool_args: dict =
     return False
 
 
+# Tool name parts that mark a read; anything else (post/delete/close/assign...) is a write
+READ_TOOL_WORDS = frozenset({"get", "list", "discover", "search", "describe", "read", "info"})
+
+def is_read_only_call(tool_call: dict) -> bool:
+    """Whether a recorded tool call only reads data (safe to replay from a cache)."""
+    method = str((tool_call.get("args") or {}).get("method", "GET")).upper()
+    return method == "GET" and bool(READ_TOOL_WORDS & set(tool_call.get("name", "").lower().split("_")))
+
+
+# ============ Prompt Normalization ============
+
+# Words that don't change what a query asks for ("list the users" == "show me all users").
+# Prepositions and verbs like "is" stay - "offenses from X" and "offenses to X" differ.
+FILLER_WORDS = frozenset("""
+    a an the all any some me my our us please can could would will you i
+    show list get give fetch display find see view tell what which qradar
+""".split())
+
+def prompt_terms(message: str) -> frozenset:
+    """Reduce a prompt to its meaningful lowercase terms for near-duplicate matching."""
+    return frozenset(w for w in re.findall(r"[a-z0-9_.]+", message.lower()) if w not in FILLER_WORDS)
+
+def term_similarity(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two term sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
 # ============ Error Classification ============
 
 class ErrorType:
@@ -111,6 +151,11 @@ class ErrorType:
     VALIDATION = "validation"
     UNKNOWN = "unknown"
 
+def is_rate_limited(error: Exception) -> bool:
+    """Whether an LLM error is a provider rate limit (HTTP 429)."""
+    error_str = str(error).lower()
+    return "429" in error_str or "rate limit" in error_str or "ratelimit" in type(error).__name__.lower()
+
 def classify_error(error: Exception) -> tuple[str, str]:
     """Classify an error and return (type, friendly_message)."""
     error_str = str(error).lower()
@@ -152,6 +197,9 @@ class AgentState(TypedDict):
 class MCPClientStdio:
     """Client for MCP Server communication via stdio (subprocess/container exec)."""
     
+    # Tool lists saved per server source + environment, so restarts skip tools/list
+    TOOL_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".mcp_cache")
+    
     def __init__(self, command: str, args: list[str], env: dict = None, cwd: str = None, 
                  container_name: str = None, container_runtime: str = "podman"):
         self.command = command
@@ -166,9 +214,6 @@ class MCPClientStdio:
     
     async def start(self):
         """Start MCP server process (via Docker/Podman if container_name provided)."""
-        import subprocess
-        import os
-        
         if self.container_name:
             # Use podman/docker exec to attach to running container
             container_cmd = [
@@ -254,13 +299,50 @@ class MCPClientStdio:
         self._process.stdin.write(notification_str)
         self._process.stdin.flush()
     
+    def _tool_manifest_path(self) -> Optional[str]:
+        """Path of the saved tool list for this server, or None if it can't be cached.
+        
+        Only local `python -m package.module` servers are cached: the key covers
+        the command, environment and the size/mtime of every .py file in the
+        server package, so any source or config change writes a new manifest.
+        """
+        if os.environ.get("MCP_NO_TOOLCACHE") or self.container_name or "-m" not in self.args[:-1]:
+            return None
+        package = self.args[self.args.index("-m") + 1].split(".")[0]
+        source_dir = os.path.join(self.cwd or os.getcwd(), package)
+        if not os.path.isdir(source_dir):
+            return None
+        
+        sig = hashlib.sha256(json.dumps([self.command, self.args, self.env], sort_keys=True).encode())
+        for root, dirs, files in os.walk(source_dir):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    sig.update(f"{os.path.relpath(path, source_dir)}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+        return os.path.join(self.TOOL_CACHE_DIR, f"tools_{sig.hexdigest()}.json")
+    
     async def list_tools(self) -> list[dict]:
         """Get available tools from MCP server."""
         if self._tools_cache:
             return self._tools_cache
         
+        manifest = self._tool_manifest_path()
+        if manifest and os.path.exists(manifest):
+            with open(manifest) as f:
+                self._tools_cache = json.load(f)
+            return self._tools_cache
+        
         response = await self._send_request("tools/list")
         self._tools_cache = response.get("result", {}).get("tools", [])
+        
+        if manifest and self._tools_cache:
+            os.makedirs(self.TOOL_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{manifest}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._tools_cache, f)
+            os.replace(tmp_path, manifest)
         return self._tools_cache
     
     async def call_tool(self, name: str, arguments: dict) -> dict:
@@ -293,8 +375,6 @@ class MCPClientHTTP:
     
     async def start(self):
         """Initialize connection to MCP server via HTTP."""
-        import httpx
-        
         print(f"[MCPClientHTTP] Connecting to {self.server_url}")
         self._client = httpx.AsyncClient(timeout=self.DEFAULT_TIMEOUT)
         
@@ -468,16 +548,29 @@ When using tools:
         model_id: str = "anthropic/claude-sonnet-4",
         base_url: str = "https://openrouter.ai/api/v1",
         mcp_client = None,  # MCPClientStdio or MCPClientHTTP
-        qradar_credentials: dict = None  # {"host": "...", "token": "..."}
+        qradar_credentials: dict = None,  # {"host": "...", "token": "..."}
+        response_cache_path: str = None,  # Opt-in on-disk cache of chat responses
+        response_cache_ttl: int = 3600,
+        semantic_cache_threshold: Optional[float] = None,  # e.g. 0.9 to serve near-duplicate prompts
+        providers: list[tuple[str, str]] = None,  # Extra (api_key, base_url) pairs to round-robin with
+        pool_size: int = 4  # Keep-alive connections opened to each provider on start
     ):
         self.api_key = api_key
         self.model_id = model_id
         self.base_url = base_url
         self.mcp_client = mcp_client
         self.qradar_credentials = qradar_credentials or {}
+        self.response_cache_path = response_cache_path
+        self.response_cache_ttl = response_cache_ttl
+        self.semantic_cache_threshold = semantic_cache_threshold
+        self.providers = [(api_key, base_url)] + list(providers or [])
+        self.pool_size = pool_size
+        self._http_client = None  # Shared by every provider's LLM
         self._graph = None
         self._tools = []
-        self._llm = None
+        self._tools_hash = ""
+        self._llms = deque()  # One LLM per provider, rotated on each call
+        self._response_cache = None
         self._started = False
     
     async def start(self):
@@ -490,34 +583,207 @@ When using tools:
             await self.mcp_client.start()
             self._tools = await self.mcp_client.list_tools()
         
-        # Create LLM
-        self._llm = ChatOpenAI(
-            model=self.model_id,
-            openai_api_key=self.api_key,
-            openai_api_base=self.base_url,
-            temperature=0.3,
-            max_tokens=2048,
-            default_headers={
-                "HTTP-Referer": "https://ibm-mcp-client.local",
-                "X-Title": "IBM MCP Client"
-            }
+        # Part of the response cache key, so a tool change invalidates old entries
+        self._tools_hash = hashlib.sha256(json.dumps(self._tools, sort_keys=True).encode()).hexdigest()
+        if self.response_cache_path and not os.environ.get("LANGGRAPH_NOCACHE"):
+            self._response_cache = shelve.open(self.response_cache_path)
+        
+        self._http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0, connect=10.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=max(self.pool_size, 1) * len(self.providers),
+                keepalive_expiry=60
+            )
         )
+        try:
+            await self._warm_connections()
+            self._create_llm()
+            
+            # Build the graph
+            self._build_graph()
+        except BaseException:
+            await self._http_client.aclose()
+            self._http_client = None
+            raise
+        self._started = True
+    
+    def set_model(self, model_id: str):
+        """Switch the LLM without restarting the MCP client or re-fetching tools."""
+        self.model_id = model_id
+        if self._started:
+            # The graph looks up self._llms on each call, so no rebuild is needed
+            self._create_llm()
+    
+    def for_model(self, model_id: str) -> "LangGraphAgent":
+        """Create an agent for another model that shares this agent's MCP client.
         
-        # Bind tools to LLM
-        if self._tools:
-            openai_tools = self._convert_tools_to_openai_format()
-            self._llm = self._llm.bind_tools(openai_tools)
+        If this agent is started, the new one is ready to chat without starting
+        the MCP client again. Only the original agent should be stopped.
+        """
+        agent = LangGraphAgent(
+            api_key=self.api_key,
+            model_id=model_id,
+            base_url=self.base_url,
+            mcp_client=self.mcp_client,
+            qradar_credentials=self.qradar_credentials,
+            response_cache_path=self.response_cache_path,
+            response_cache_ttl=self.response_cache_ttl,
+            semantic_cache_threshold=self.semantic_cache_threshold,
+            providers=self.providers[1:],
+            pool_size=self.pool_size
+        )
+        if self._started:
+            agent._tools = self._tools
+            agent._tools_hash = self._tools_hash
+            agent._response_cache = self._response_cache
+            agent._http_client = self._http_client
+            agent._create_llm()
+            agent._build_graph()
+            agent._started = True
+        return agent
+    
+    def _create_llm(self):
+        """Create an LLM per provider for the current model and bind the MCP tools to each."""
+        openai_tools = self._convert_tools_to_openai_format() if self._tools else None
         
-        # Build the graph
-        self._build_graph()
-        self._started = True
+        self._llms = deque()
+        for api_key, base_url in self.providers:
+            llm = ChatOpenAI(
+                model=self.model_id,
+                openai_api_key=api_key,
+                openai_api_base=base_url,
+                temperature=0.3,
+                max_tokens=2048,
+                http_async_client=self._http_client,
+                default_headers={
+                    "HTTP-Referer": "https://ibm-mcp-client.local",
+                    "X-Title": "IBM MCP Client"
+                }
+            )
+            
+            # Bind tools to LLM
+            if openai_tools:
+                llm = llm.bind_tools(openai_tools)
+            self._llms.append(llm)
+    
+    async def _warm_connections(self):
+        """Open pool_size connections to each provider so the first chat skips the TLS handshake."""
+        base_urls = {base_url for _, base_url in self.providers}
+        results = await asyncio.gather(
+            *(self._http_client.head(url) for url in base_urls for _ in range(self.pool_size)),
+            return_exceptions=True
+        )
+        # Any HTTP status is fine - only the open connection matters
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures:
+            agent_logger.warning("WARM_CONNECTIONS", str(failures[0])[:100])
+    
+    async def _invoke_llm(self, messages: list[BaseMessage], max_rounds: int = 3):
+        """Invoke the next provider's LLM, moving past rate-limited providers.
+        
+        Each call takes the provider at the head of the pool and rotates it to
+        the back, so concurrent chats spread over every key's rate limit. Once
+        every provider has returned 429 in a round, back off exponentially.
+        """
+        for attempt in range(max_rounds * len(self._llms)):
+            llm = self._llms[0]
+            self._llms.rotate(-1)
+            try:
+                return await llm.ainvoke(messages)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == max_rounds * len(self._llms) - 1:
+                    raise
+                agent_logger.error("LLM_RATE_LIMITED", str(e)[:100])
+                if (attempt + 1) % len(self._llms) == 0:
+                    await asyncio.sleep(2 ** (attempt // len(self._llms)))
     
     async def stop(self):
         """Stop the agent."""
         if self.mcp_client:
             await self.mcp_client.stop()
+        if self._response_cache is not None:
+            self._response_cache.close()
+            self._response_cache = None
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
         self._started = False
     
+    def _backend_signature(self) -> list:
+        """What identifies the data the tools query: the QRadar host and how the MCP server is reached."""
+        client = {
+            attr: getattr(self.mcp_client, attr)
+            for attr in ("command", "args", "env", "cwd", "container_name", "server_url")
+            if hasattr(self.mcp_client, attr)
+        }
+        return [self.qradar_credentials.get("host"), client]
+    
+    def _response_cache_key(self, message: str) -> str:
+        """Cache key covering everything that shapes the response."""
+        key_data = [self.model_id, self._tools_hash, self._backend_signature(), self.SYSTEM_PROMPT, message]
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _semantic_index_key(self) -> str:
+        """Key of the near-duplicate index, namespaced like the exact entries."""
+        key_data = [self.model_id, self._tools_hash, self._backend_signature(), self.SYSTEM_PROMPT]
+        return "semantic:" + hashlib.sha256(
+            json.dumps(key_data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+    
+    def _cache_lookup(self, message: str, cache_key: str) -> Optional[dict]:
+        """Return a live cached response for this message or a near-duplicate of it."""
+        now = time.time()
+        cached = self._response_cache.get(cache_key)
+        if cached and cached[1] is None:
+            # This prompt has made changes before - always run it
+            return None
+        if cached and now - cached[0] < self.response_cache_ttl:
+            return cached[1]
+        
+        if self.semantic_cache_threshold is None:
+            return None
+        terms = prompt_terms(message)
+        best_key, best_score = None, self.semantic_cache_threshold
+        for stored_at, stored_terms, key in self._response_cache.get(self._semantic_index_key(), []):
+            if now - stored_at >= self.response_cache_ttl:
+                continue
+            score = term_similarity(terms, stored_terms)
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        cached = self._response_cache.get(best_key)
+        if cached and cached[1] is not None and now - cached[0] < self.response_cache_ttl:
+            agent_logger.stage("CACHE_NEAR_HIT", f"Similarity: {best_score:.2f}")
+            return cached[1]
+        return None
+    
+    def _cache_store(self, message: str, cache_key: str, response: dict):
+        """Store a response and index its prompt terms for near-duplicate lookups.
+        
+        A response whose run called a write tool is never stored; the prompt is
+        marked instead so later runs of it always reach the tools.
+        """
+        now = time.time()
+        # An answer built on failed tool calls (e.g. QRadar unreachable) must not outlive the outage
+        if any(tc.get("status") != "success" for tc in response["tools_called"]):
+            return
+        if not all(is_read_only_call(tc) for tc in response["tools_called"]):
+            self._response_cache[cache_key] = (now, None)
+            return
+        self._response_cache[cache_key] = (now, response)
+        
+        terms = prompt_terms(message)
+        if self.semantic_cache_threshold is None or not terms:
+            return
+        index_key = self._semantic_index_key()
+        index = [
+            entry for entry in self._response_cache.get(index_key, [])
+            if now - entry[0] < self.response_cache_ttl and entry[2] != cache_key
+        ]
+        index.append((now, terms, cache_key))
+        self._response_cache[index_key] = index
+    
     def _convert_tools_to_openai_format(self) -> list[dict]:
         """Convert MCP tools to OpenAI function format."""
         openai_tools = []
@@ -544,12 +810,11 @@ When using tools:
             full_messages = [SystemMessage(content=self.SYSTEM_PROMPT)] + messages
             
             agent_logger.llm_call(self.model_id)
-            response = await self._llm.ainvoke(full_messages)
+            response = await self._invoke_llm(full_messages)
             return {"messages": [response], "tools_called": []}
         
         # Tool execution node
         async def execute_tools(state: AgentState) -> dict:
-            import time
             agent_logger.stage("TOOLS", "Executing tool calls")
             messages = state["messages"]
             last_message = messages[-1]
@@ -718,7 +983,8 @@ When using tools:
             await self.start()
         
         # Check if this is a dangerous operation
-        if is_dangerous_operation(message) and not confirmed:
+        dangerous = is_dangerous_operation(message)
+        if dangerous and not confirmed:
             agent_logger.stage("CONFIRMATION_REQUIRED", "Dangerous operation detected")
             return {
                 "content": "⚠️ **Confirmation Required**\n\nThis appears to be a destructive operation (delete/remove). Please confirm you want to proceed.",
@@ -727,6 +993,15 @@ When using tools:
                 "original_message": message
             }
         
+        # Destructive operations always run - replaying them from cache would skip the action
+        cache_key = None
+        if self._response_cache is not None and not dangerous:
+            cache_key = self._response_cache_key(message)
+            cached = self._cache_lookup(message, cache_key)
+            if cached is not None:
+                agent_logger.stage("CACHE_HIT", f"Model: {self.model_id}")
+                return cached
+        
         initial_state: AgentState = {
             "messages": [HumanMessage(content=message)],
             "tools_called": [],
@@ -742,10 +1017,34 @@ When using tools:
         
         agent_logger.stage("CHAT_END", f"Tools called: {len(result.get('tools_called', []))}")
         
-        return {
+        response = {
             "content": content,
             "tools_called": result.get("tools_called", [])
         }
+        if cache_key:
+            self._cache_store(message, cache_key, response)
+        return response
+    
+    async def chat_batch(self, messages: list[str], max_concurrency: int = 4) -> list[dict]:
+        """Process several independent messages concurrently, results in input order.
+        
+        Chat completions with tool calling have no multi-prompt request, so each
+        message still runs its own graph; the LLM round-trips overlap instead.
+        """
+        if not self._started:
+            await self.start()
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_one(message: str) -> dict:
+            async with semaphore:
+                try:
+                    return await self.chat(message)
+                except Exception as e:
+                    agent_logger.error("CHAT_BATCH", str(e))
+                    return {"content": "", "tools_called": [], "error": str(e)}
+        
+        return await asyncio.gather(*(run_one(m) for m in messages))
     
     async def chat_stream(self, message: str, confirmed: bool = False) -> AsyncGenerator[dict, None]:
         """Process a chat message with streaming updates."""
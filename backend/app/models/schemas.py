@@ -46,6 +46,10 @@ class ChatStreamRequest(BaseModel):
     message: str
 
 
+class ChatBatchRequest(BaseModel):
+    messages: List[str]
+
+
 class ChatResponse(BaseModel):
     chat_id: str
     message: Message
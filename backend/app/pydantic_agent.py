@@ -5,6 +5,7 @@ Uses PydanticAI's built-in MCPServerSSE and MCPServerStdio for
 connecting to MCP servers. Replaces 850-line LangGraph agent.
 """
 
+import asyncio
 import json
 import logging
 import os
@@ -17,6 +18,25 @@ from pydantic_ai.mcp import MCPServerSSE, MCPServerStdio
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = (
+    "You are an AI assistant with access to IBM security tools via MCP servers.\n\n"
+    "Available MCP Servers and their tools:\n"
+    "- QRadar MCP Server: Query IBM QRadar SIEM - use tools like qradar_get, qradar_post, "
+    "search_offenses, execute_aql, etc.\n"
+    "- GCM MCP Server: Query IBM Guardium Cryptographic Manager - use tools like gcm_api, "
+    "list_services, get_health, etc.\n\n"
+    "When asked about versions:\n"
+    "- QRadar version: use qradar_get with endpoint=\"/system/about\"\n"
+    "- GCM version: use gcm_api with service=\"config\", endpoint=\"/version\"\n\n"
+    "Always pick the correct server's tools based on the product being asked about.\n"
+    "Return results clearly formatted."
+)
+
+# Agent runs in flight at once within a batch
+BATCH_CONCURRENCY = 4
+# Seconds one batch message may run before it is reported as an error
+BATCH_MESSAGE_TIMEOUT = 60
+
 
 def _build_toolsets(mcp_servers: list[dict]):
     """Build MCP server toolsets from config."""
@@ -80,19 +100,7 @@ async def create_agent(
 
     agent = Agent(
         model=llm,
-        system_prompt=(
-            "You are an AI assistant with access to IBM security tools via MCP servers.\n\n"
-            "Available MCP Servers and their tools:\n"
-            "- QRadar MCP Server: Query IBM QRadar SIEM - use tools like qradar_get, qradar_post, "
-            "search_offenses, execute_aql, etc.\n"
-            "- GCM MCP Server: Query IBM Guardium Cryptographic Manager - use tools like gcm_api, "
-            "list_services, get_health, etc.\n\n"
-            "When asked about versions:\n"
-            "- QRadar version: use qradar_get with endpoint=\"/system/about\"\n"
-            "- GCM version: use gcm_api with service=\"config\", endpoint=\"/version\"\n\n"
-            "Always pick the correct server's tools based on the product being asked about.\n"
-            "Return results clearly formatted."
-        ),
+        system_prompt=SYSTEM_PROMPT,
         toolsets=toolsets,
     )
 
@@ -127,19 +135,7 @@ async def run_agent_sync(
 
     agent = Agent(
         model=llm,
-        system_prompt=(
-            "You are an AI assistant with access to IBM security tools via MCP servers.\n\n"
-            "Available MCP Servers and their tools:\n"
-            "- QRadar MCP Server: Query IBM QRadar SIEM - use tools like qradar_get, qradar_post, "
-            "search_offenses, execute_aql, etc.\n"
-            "- GCM MCP Server: Query IBM Guardium Cryptographic Manager - use tools like gcm_api, "
-            "list_services, get_health, etc.\n\n"
-            "When asked about versions:\n"
-            "- QRadar version: use qradar_get with endpoint=\"/system/about\"\n"
-            "- GCM version: use gcm_api with service=\"config\", endpoint=\"/version\"\n\n"
-            "Always pick the correct server's tools based on the product being asked about.\n"
-            "Return results clearly formatted."
-        ),
+        system_prompt=SYSTEM_PROMPT,
         toolsets=toolsets,
     )
 
@@ -147,3 +143,45 @@ async def run_agent_sync(
     result = await agent.run(message)
     logger.info(f"Agent completed, output: {result.output[:200]}")
     return {"content": result.output, "servers": server_names}
+
+
+async def run_agent_batch(
+    model: str,
+    base_url: str,
+    api_key: str,
+    mcp_servers: list[dict],
+    messages: list[str],
+) -> dict:
+    """Run several messages on one agent, connecting to the MCP servers once."""
+    provider = OpenAIProvider(base_url=base_url, api_key=api_key)
+    llm = OpenAIModel(model, provider=provider)
+
+    toolsets, server_names, _ = _build_toolsets(mcp_servers)
+
+    if not toolsets:
+        return {"error": "No MCP servers available"}
+
+    agent = Agent(
+        model=llm,
+        system_prompt=SYSTEM_PROMPT,
+        toolsets=toolsets,
+    )
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_one(message: str) -> dict:
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(agent.run(message), BATCH_MESSAGE_TIMEOUT)
+                return {"content": result.output}
+            except asyncio.TimeoutError:
+                logger.error(f"Agent batch message timed out after {BATCH_MESSAGE_TIMEOUT}s")
+                return {"error": f"Timed out after {BATCH_MESSAGE_TIMEOUT}s"}
+            except Exception as e:
+                logger.error(f"Agent error on batch message: {e}", exc_info=True)
+                return {"error": str(e)}
+
+    logger.info(f"Running agent batch of {len(messages)} with {len(toolsets)} servers: {', '.join(server_names)}")
+    # Entering the agent keeps the MCP connections open across all runs
+    async with agent:
+        results = await asyncio.gather(*(run_one(m) for m in messages))
+    return {"results": results, "servers": server_names}
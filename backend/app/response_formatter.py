@@ -10,18 +10,40 @@ regardless of which LLM is used. Handles:
 """
 
 import json
+from itertools import chain, islice
 from typing import Any, Union, List, Dict
 from datetime import datetime
 
 
+# Columns shown first in tables, in this order (lower rank = further left)
+_PRIORITY_RANK = {
+    name: rank for rank, name in enumerate([
+        'id', 'name', 'username', 'status', 'description', 'type',
+        'severity', 'offense_type', 'start_time', 'created', 'updated'
+    ])
+}
+_MAX_TABLE_COLUMNS = 6
+
+# Thresholds
+_MAX_TABLE_ROWS = 20
+_MAX_LIST_ITEMS = 15
+_MAX_STRING_LENGTH = 5000
+_SUMMARY_THRESHOLD = 10
+
+
+def _column_sort_key(key: str) -> tuple:
+    """Sort key: priority fields first, then alphabetical."""
+    return (_PRIORITY_RANK.get(key, len(_PRIORITY_RANK)), key)
+
+
 class ResponseFormatter:
     """Model-independent response formatting layer."""
     
     # Thresholds
-    MAX_TABLE_ROWS = 20
-    MAX_LIST_ITEMS = 15
-    MAX_STRING_LENGTH = 5000
-    SUMMARY_THRESHOLD = 10
+    MAX_TABLE_ROWS = _MAX_TABLE_ROWS
+    MAX_LIST_ITEMS = _MAX_LIST_ITEMS
+    MAX_STRING_LENGTH = _MAX_STRING_LENGTH
+    SUMMARY_THRESHOLD = _SUMMARY_THRESHOLD
     
     def __init__(self):
         pass
@@ -149,13 +171,7 @@ class ResponseFormatter:
     
     def _format_simple_list(self, data: list, total_count: int) -> str:
         """Format list of simple values."""
-        display_data = data[:self.MAX_LIST_ITEMS]
-        
-        lines = []
-        for item in display_data:
-            lines.append(f"- {item}")
-        
-        result = "\n".join(lines)
+        result = "\n".join(f"- {item}" for item in islice(data, self.MAX_LIST_ITEMS))
         
         if total_count > self.MAX_LIST_ITEMS:
             result += f"\n\n_... and {total_count - self.MAX_LIST_ITEMS} more items (showing {self.MAX_LIST_ITEMS} of {total_count})_"
@@ -168,45 +184,31 @@ class ResponseFormatter:
             return "_No items_"
         
         # Get columns from first item, prioritize important fields
-        first_item = data[0]
-        all_keys = list(first_item.keys())
-        
-        # Prioritize common important fields
-        priority_fields = ['id', 'name', 'username', 'status', 'description', 'type', 
-                          'severity', 'offense_type', 'start_time', 'created', 'updated']
+        # Sort keys: priority first, then alphabetical (max 6 columns)
+        columns = sorted(data[0].keys(), key=_column_sort_key)[:_MAX_TABLE_COLUMNS]
         
-        # Sort keys: priority first, then alphabetical
-        columns = []
-        for pf in priority_fields:
-            if pf in all_keys:
-                columns.append(pf)
-        for key in all_keys:
-            if key not in columns and len(columns) < 6:  # Max 6 columns
-                columns.append(key)
-        
-        # Limit rows
-        display_data = data[:self.MAX_TABLE_ROWS]
+        # Bind hot lookups to locals for the per-cell loop
+        max_rows = self.MAX_TABLE_ROWS
+        fmt_key = self._format_key
+        fmt_cell = self._format_cell_value
         
         # Build table header
-        header = "| " + " | ".join(self._format_key(col) for col in columns) + " |"
+        header = "| " + " | ".join(fmt_key(col) for col in columns) + " |"
         separator = "|" + "|".join("---" for _ in columns) + "|"
         
-        # Build rows
-        rows = []
-        for item in display_data:
-            row_values = []
-            for col in columns:
-                value = item.get(col, "")
-                formatted = self._format_cell_value(value)
-                row_values.append(formatted)
-            rows.append("| " + " | ".join(row_values) + " |")
+        # Build rows lazily over the first max_rows items (no slice copy),
+        # binding each row's dict.get once instead of per cell
+        rows = (
+            "| " + " | ".join(fmt_cell(get(col, "")) for col in columns) + " |"
+            for get in (item.get for item in islice(data, max_rows))
+        )
         
-        result = "\n".join([header, separator] + rows)
+        result = "\n".join(chain((header, separator), rows))
         
         # Add summary if truncated
-        if total_count > self.MAX_TABLE_ROWS:
-            result = f"**Found {total_count:,} items** (showing first {self.MAX_TABLE_ROWS})\n\n" + result
-            result += f"\n\n_... {total_count - self.MAX_TABLE_ROWS} more items not shown_"
+        if total_count > max_rows:
+            result = f"**Found {total_count:,} items** (showing first {max_rows})\n\n" + result
+            result += f"\n\n_... {total_count - max_rows} more items not shown_"
         elif total_count > 1:
             result = f"**{total_count} items:**\n\n" + result
         
@@ -214,10 +216,8 @@ class ResponseFormatter:
     
     def _format_mixed_list(self, data: list, total_count: int) -> str:
         """Format list with mixed types."""
-        display_data = data[:self.MAX_LIST_ITEMS]
-        
         parts = []
-        for i, item in enumerate(display_data, 1):
+        for i, item in enumerate(islice(data, self.MAX_LIST_ITEMS), 1):
             if isinstance(item, dict):
                 parts.append(f"**Item {i}:**\n{self._format_dict(item)}")
             else:
@@ -284,7 +284,7 @@ class ResponseFormatter:
         """
         if isinstance(data, list):
             total = len(data)
-            truncated = data[:max_items]
+            truncated = list(islice(data, max_items))
             return {
                 "summary": f"Found **{total:,}** items (showing first {min(max_items, total)})",
                 "data": truncated,
@@ -3,10 +3,13 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from typing import AsyncGenerator, Optional, Union
+import asyncio
 import json
-import uuid
 import os
+import threading
+import traceback
 from datetime import datetime
+from functools import lru_cache
 import logging
 
 from app.models.schemas import ChatRequest, ChatResponse, Message, MessageRole
@@ -18,33 +21,55 @@ from app.conversation_handler import needs_clarification, extract_intent
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Coalesce streamed content deltas into one SSE frame per window
+DELTA_FLUSH_INTERVAL = 0.02  # seconds
+DELTA_FLUSH_MAX_CHUNKS = 8
+
+
+# Pre-generated random IDs (one urandom read per batch instead of per ID)
+_ID_POOL: list[str] = []
+_ID_LOCK = threading.Lock()
+_ID_BATCH_SIZE = 256
+
+
+def _new_id() -> str:
+    """Return a random 128-bit hex ID from the pre-generated pool."""
+    with _ID_LOCK:
+        if not _ID_POOL:
+            raw = os.urandom(16 * _ID_BATCH_SIZE).hex()
+            _ID_POOL.extend(raw[i:i + 32] for i in range(0, len(raw), 32))
+        return _ID_POOL.pop()
+
+
+@lru_cache(maxsize=32)
+def _parse_env(env_str: str) -> tuple[tuple[str, str], ...]:
+    """Parse a "KEY=value KEY2=value2" env string into (key, value) pairs."""
+    pairs = []
+    for token in env_str.split():
+        key, sep, value = token.partition("=")
+        if sep:
+            pairs.append((key, value))
+    return tuple(pairs)
+
 
 # In-memory chat storage (replace with database in production)
 chats: dict = {}
 
 # Agent instance (lazy initialized)
 _agent: Optional[LangGraphAgent] = None
-_agent_config_hash: Optional[str] = None  # Track config changes
+_agent_config_version: Optional[int] = None  # Track config changes
 
 
 async def get_agent() -> Optional[LangGraphAgent]:
     """Get or create the LangGraph Agent based on configuration."""
-    global _agent, _agent_config_hash
-    
-    # Get current configuration
-    models = config_store.get_llm_models()
-    mcp_servers = config_store.get_mcp_servers()
+    global _agent, _agent_config_version
     
-    # Create a hash of the current config to detect changes
-    import hashlib
-    config_str = json.dumps({
-        "models": models,
-        "servers": mcp_servers
-    }, sort_keys=True)
-    current_hash = hashlib.md5(config_str.encode()).hexdigest()
+    # Get current configuration (cached until the config changes)
+    snapshot = config_store.get_snapshot()
+    current_version = snapshot.version
     
     # Reset agent if config changed
-    if _agent is not None and _agent_config_hash != current_hash:
+    if _agent is not None and _agent_config_version != current_version:
         try:
             await _agent.stop()
         except:
@@ -54,7 +79,9 @@ async def get_agent() -> Optional[LangGraphAgent]:
     if _agent is not None:
         return _agent
     
-    _agent_config_hash = current_hash
+    _agent_config_version = current_version
+    models = snapshot.llm_models
+    mcp_servers = snapshot.mcp_servers
     
     if not models:
         return None
@@ -91,7 +118,9 @@ async def get_agent() -> Optional[LangGraphAgent]:
         # Get environment variables for MCP server
         env_vars = mcp_config.get("env", {})
         if isinstance(env_vars, str):
-            env_vars = dict(item.split("=", 1) for item in env_vars.split() if "=" in item)
+            env_vars = dict(_parse_env(env_vars))
+        else:
+            env_vars = dict(env_vars)  # Don't mutate the shared config snapshot
         
         # Get QRadar credentials to pass to agent
         qradar_credentials = {}
@@ -158,7 +187,9 @@ async def send_message(request: ChatRequest):
     logger.info(f"[CHAT] New message - chat_id={request.chat_id or 'new'}, message='{request.message[:100]}...'")
     
     # Generate or use existing chat ID
-    chat_id = request.chat_id or str(uuid.uuid4())
+    chat_id = request.chat_id or _new_id()
+    # Timestamp shared by messages built before the agent runs
+    now = datetime.utcnow()
     
     if chat_id not in chats:
         chats[chat_id] = []
@@ -166,34 +197,37 @@ async def send_message(request: ChatRequest):
     # Get session memory for this chat
     session = get_session(chat_id)
     
+    # Messages below are built from trusted values, so they use
+    # model_construct() to skip pydantic validation.
+    
     # Check for duplicate queries (return cached response)
     cached_response = session.is_duplicate_query(request.message)
     if cached_response:
-        assistant_message = Message(
-            id=str(uuid.uuid4()),
+        assistant_message = Message.model_construct(
+            id=_new_id(),
             role=MessageRole.ASSISTANT,
             content=cached_response + "\n\n_📋 (cached response)_",
-            timestamp=datetime.utcnow()
+            timestamp=now
         )
         return ChatResponse(chat_id=chat_id, message=assistant_message)
     
     # Check if clarification needed
     needs_clarify, clarify_msg = needs_clarification(request.message)
     if needs_clarify and clarify_msg:
-        assistant_message = Message(
-            id=str(uuid.uuid4()),
+        assistant_message = Message.model_construct(
+            id=_new_id(),
             role=MessageRole.ASSISTANT,
             content=clarify_msg,
-            timestamp=datetime.utcnow()
+            timestamp=now
         )
         return ChatResponse(chat_id=chat_id, message=assistant_message)
     
     # Create user message
-    user_message = Message(
-        id=str(uuid.uuid4()),
+    user_message = Message.model_construct(
+        id=_new_id(),
         role=MessageRole.USER,
         content=request.message,
-        timestamp=datetime.utcnow()
+        timestamp=now
     )
     chats[chat_id].append(user_message)
     
@@ -222,8 +256,8 @@ async def send_message(request: ChatRequest):
                     else:
                         content += f"- {tc['name']}: ✅ Success\n"
             
-            assistant_message = Message(
-                id=str(uuid.uuid4()),
+            assistant_message = Message.model_construct(
+                id=_new_id(),
                 role=MessageRole.ASSISTANT,
                 content=content,
                 timestamp=datetime.utcnow()
@@ -237,8 +271,8 @@ async def send_message(request: ChatRequest):
             )
         except Exception as e:
             logger.error(f"[CHAT] Error processing request - chat_id={chat_id}: {e}", exc_info=True)
-            assistant_message = Message(
-                id=str(uuid.uuid4()),
+            assistant_message = Message.model_construct(
+                id=_new_id(),
                 role=MessageRole.ASSISTANT,
                 content=f"Error processing request: {str(e)}",
                 timestamp=datetime.utcnow()
@@ -248,11 +282,11 @@ async def send_message(request: ChatRequest):
         logger.warning(f"[CHAT] Agent not configured - chat_id={chat_id}")
         logger.warning(f"[CHAT] Available models: {len(config_store.get_llm_models())}")
         logger.warning(f"[CHAT] Available MCP servers: {len(config_store.get_mcp_servers())}")
-        assistant_message = Message(
-            id=str(uuid.uuid4()),
+        assistant_message = Message.model_construct(
+            id=_new_id(),
             role=MessageRole.ASSISTANT,
             content="⚠️ **Agent not configured**\n\nPlease configure:\n1. An LLM model (Settings → Models)\n2. An MCP server (Settings → MCP Servers)\n\nThen try again!",
-            timestamp=datetime.utcnow()
+            timestamp=now
         )
     
     chats[chat_id].append(assistant_message)
@@ -269,7 +303,7 @@ async def send_message_stream(request: ChatRequest):
     
     async def generate() -> AsyncGenerator[str, None]:
         # Generate or use existing chat ID
-        chat_id = request.chat_id or str(uuid.uuid4())
+        chat_id = request.chat_id or _new_id()
         
         # Send chat ID first
         yield f"data: {json.dumps({'type': 'chat_id', 'chat_id': chat_id})}\n\n"
@@ -278,6 +312,18 @@ async def send_message_stream(request: ChatRequest):
         agent = await get_agent()
         
         if agent:
+            loop = asyncio.get_running_loop()
+            pending_deltas = []
+            last_flush = loop.time()
+            
+            def flush_deltas() -> str:
+                """Build one SSE frame from buffered deltas and reset the buffer."""
+                nonlocal last_flush
+                frame = f"data: {json.dumps({'type': 'content_delta', 'delta': ''.join(pending_deltas)})}\n\n"
+                pending_deltas.clear()
+                last_flush = loop.time()
+                return frame
+            
             try:
                 final_content = ""
                 tools_used = []
@@ -286,6 +332,20 @@ async def send_message_stream(request: ChatRequest):
                 async for event in agent.chat_stream(request.message):
                     event_type = event.get("type")
                     
+                    if event_type == "content_delta":
+                        # Streaming content chunks - buffered, flushed per window
+                        delta = event.get("delta", "")
+                        final_content += delta
+                        pending_deltas.append(delta)
+                        if (len(pending_deltas) >= DELTA_FLUSH_MAX_CHUNKS
+                                or loop.time() - last_flush >= DELTA_FLUSH_INTERVAL):
+                            yield flush_deltas()
+                        continue
+                    
+                    # Keep ordering: emit buffered text before any other event
+                    if pending_deltas:
+                        yield flush_deltas()
+                    
                     if event_type == "status":
                         yield f"data: {json.dumps(event)}\n\n"
                     
@@ -296,11 +356,6 @@ async def send_message_stream(request: ChatRequest):
                     elif event_type == "tool_result":
                         yield f"data: {json.dumps(event)}\n\n"
                     
-                    elif event_type == "content_delta":
-                        # Streaming content chunks
-                        final_content += event.get("delta", "")
-                        yield f"data: {json.dumps({'type': 'content_delta', 'delta': event.get('delta', '')})}\n\n"
-                    
                     elif event_type in ("content", "content_final"):
                         final_content = event.get("content", "")
                         yield f"data: {json.dumps({'type': 'content', 'content': final_content})}\n\n"
@@ -315,10 +370,14 @@ async def send_message_stream(request: ChatRequest):
                     
                     elif event_type == "done":
                         break
+                
+                if pending_deltas:
+                    yield flush_deltas()
                         
             except Exception as e:
-                import traceback
                 traceback.print_exc()
+                if pending_deltas:
+                    yield flush_deltas()
                 yield f"data: {json.dumps({'type': 'error', 'content': f'Error: {str(e)}'})}\n\n"
         else:
             # No agent configured
@@ -6,19 +6,19 @@ from typing import AsyncGenerator
 import json
 import logging
 
-from app.models.schemas import ChatStreamRequest
-from app.pydantic_agent import create_agent, run_agent_sync
+from app.models.schemas import ChatBatchRequest, ChatStreamRequest
+from app.pydantic_agent import create_agent, run_agent_batch, run_agent_sync
 from app import config_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def _get_agent_config(mcp_servers):
-    """Get LLM config and inject QRadar credentials into MCP servers."""
-    models = config_store.get_llm_models()
+def _get_agent_config(snapshot: config_store.ConfigSnapshot):
+    """Get LLM config and MCP servers with QRadar credentials injected."""
+    models = snapshot.llm_models
     if not models:
-        return None, None, None, "No LLM models configured"
+        return None, None, None, None, "No LLM models configured"
 
     llm_config = next((m for m in models if m.get("is_default")), models[0])
     provider = llm_config.get("provider", "openrouter")
@@ -32,30 +32,46 @@ def _get_agent_config(mcp_servers):
     else:
         base_url = llm_config.get("base_url", "https://openrouter.ai/api/v1")
 
-    # Inject QRadar credentials
-    for server in mcp_servers:
-        if server.get("qradarConnectionId"):
-            qradar_conn = config_store.get_qradar_connection(server["qradarConnectionId"])
-            if qradar_conn:
-                env_vars = server.get("env", {})
-                if isinstance(env_vars, str):
-                    env_vars = {}
-                env_vars["QRADAR_HOST"] = qradar_conn.get("url", "")
-                env_vars["QRADAR_API_TOKEN"] = qradar_conn.get("token", "")
-                server["env"] = env_vars
+    return model_id, base_url, api_key, _get_mcp_servers(snapshot), None
 
-    return model_id, base_url, api_key, None
+
+# (snapshot version, MCP servers with credentials injected)
+_resolved_servers: tuple[int, list[dict]] | None = None
+
+
+def _get_mcp_servers(snapshot: config_store.ConfigSnapshot) -> list[dict]:
+    """Get MCP servers with QRadar credentials injected, cached per config version."""
+    global _resolved_servers
+    if _resolved_servers is not None and _resolved_servers[0] == snapshot.version:
+        return _resolved_servers[1]
+
+    # Inject QRadar credentials into copies - the snapshot is shared
+    connections = snapshot.qradar_connections_by_id
+    mcp_servers = []
+    for server in snapshot.mcp_servers:
+        server = dict(server)
+        qradar_conn = connections.get(server.get("qradarConnectionId"))
+        if qradar_conn:
+            env_vars = server.get("env", {})
+            env_vars = dict(env_vars) if isinstance(env_vars, dict) else {}
+            env_vars["QRADAR_HOST"] = qradar_conn.get("url", "")
+            env_vars["QRADAR_API_TOKEN"] = qradar_conn.get("token", "")
+            server["env"] = env_vars
+        mcp_servers.append(server)
+
+    _resolved_servers = (snapshot.version, mcp_servers)
+    return mcp_servers
 
 
 async def stream_chat(request: ChatStreamRequest) -> AsyncGenerator[str, None]:
     """Stream chat responses using PydanticAI agent."""
     try:
-        mcp_servers = config_store.get_mcp_servers()
-        if not mcp_servers:
+        snapshot = config_store.get_snapshot()
+        if not snapshot.mcp_servers:
             yield f"data: {json.dumps({'type': 'error', 'content': 'No MCP servers configured'})}\n\n"
             return
 
-        model_id, base_url, api_key, error = _get_agent_config(mcp_servers)
+        model_id, base_url, api_key, mcp_servers, error = _get_agent_config(snapshot)
         if error:
             yield f"data: {json.dumps({'type': 'error', 'content': error})}\n\n"
             return
@@ -87,11 +103,11 @@ async def chat_stream(request: ChatStreamRequest):
 async def chat_ask(request: ChatStreamRequest):
     """Non-streaming chat endpoint. Returns full response as JSON."""
     try:
-        mcp_servers = config_store.get_mcp_servers()
-        if not mcp_servers:
+        snapshot = config_store.get_snapshot()
+        if not snapshot.mcp_servers:
             raise HTTPException(status_code=400, detail="No MCP servers configured")
 
-        model_id, base_url, api_key, error = _get_agent_config(mcp_servers)
+        model_id, base_url, api_key, mcp_servers, error = _get_agent_config(snapshot)
         if error:
             raise HTTPException(status_code=400, detail=error)
 
@@ -105,3 +121,27 @@ async def chat_ask(request: ChatStreamRequest):
     except Exception as e:
         logger.error(f"Chat error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch")
+async def chat_batch(request: ChatBatchRequest):
+    """Non-streaming chat for several messages sharing one MCP connection setup."""
+    try:
+        snapshot = config_store.get_snapshot()
+        if not snapshot.mcp_servers:
+            raise HTTPException(status_code=400, detail="No MCP servers configured")
+
+        model_id, base_url, api_key, mcp_servers, error = _get_agent_config(snapshot)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+
+        result = await run_agent_batch(
+            model=model_id, base_url=base_url, api_key=api_key,
+            mcp_servers=mcp_servers, messages=request.messages,
+        )
+        return JSONResponse(content=result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Chat batch error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
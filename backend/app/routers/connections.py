@@ -1,7 +1,9 @@
 """Connections router - manages QRadar and LLM connections."""
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 import httpx
 import uuid
 
@@ -16,6 +18,33 @@ from app import config_store
 
 router = APIRouter()
 
+# Pooled clients for QRadar connection tests, keyed by SSL verify flag
+_QRADAR_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30)
+_QRADAR_TIMEOUT = httpx.Timeout(10.0, connect=2.0, read=8.0)
+_qradar_clients: dict[bool, httpx.AsyncClient] = {}
+
+
+def _get_qradar_client(verify: bool) -> httpx.AsyncClient:
+    """Get the shared QRadar client for this verify setting (created lazily)."""
+    client = _qradar_clients.get(verify)
+    if client is None:
+        # Only connections are pooled - a jar that refuses every cookie keeps a QRadar
+        # session cookie from one test from authenticating the next (e.g. a bad token)
+        no_cookies = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+        client = httpx.AsyncClient(
+            verify=verify, timeout=_QRADAR_TIMEOUT, limits=_QRADAR_LIMITS, cookies=no_cookies
+        )
+        _qradar_clients[verify] = client
+    return client
+
+
+@router.on_event("shutdown")
+async def _close_qradar_clients():
+    """Close pooled QRadar clients on app shutdown."""
+    for client in _qradar_clients.values():
+        await client.aclose()
+    _qradar_clients.clear()
+
 
 # ============== QRadar Connections ==============
 
@@ -25,12 +54,16 @@ async def list_qradar_connections():
     return config_store.get_qradar_connections()
 
 
+# Write endpoints return JSONResponse directly: the body was just validated
+# as the request model, so FastAPI's response_model re-validation is skipped
+# (response_model is kept for the OpenAPI schema).
+
 @router.post("/qradar", response_model=QRadarConnection)
 async def create_qradar_connection(conn: QRadarConnectionCreate):
     """Create a new QRadar connection."""
     conn_data = conn.model_dump()
     conn_data["id"] = str(uuid.uuid4())
-    return config_store.save_qradar_connection(conn_data)
+    return JSONResponse(config_store.save_qradar_connection(conn_data))
 
 
 @router.get("/qradar/{conn_id}", response_model=QRadarConnection)
@@ -51,7 +84,7 @@ async def update_qradar_connection(conn_id: str, conn: QRadarConnectionCreate):
     
     conn_data = conn.model_dump()
     conn_data["id"] = conn_id
-    return config_store.save_qradar_connection(conn_data)
+    return JSONResponse(config_store.save_qradar_connection(conn_data))
 
 
 @router.delete("/qradar/{conn_id}")
@@ -72,29 +105,29 @@ async def test_qradar_direct(req: QRadarTestRequest):
     """Test QRadar connection directly with credentials."""
     try:
         url = req.url.rstrip("/")
-        async with httpx.AsyncClient(verify=req.verify, timeout=10.0) as client:
-            response = await client.get(
-                f"{url}/api/system/about",
-                headers={"SEC": req.token, "Accept": "application/json"}
+        client = _get_qradar_client(req.verify)
+        response = await client.get(
+            f"{url}/api/system/about",
+            headers={"SEC": req.token, "Accept": "application/json"}
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            return QRadarConnectionTest(
+                success=True,
+                message="Connection successful",
+                version=data.get("external_version", "Unknown")
+            )
+        elif response.status_code == 401:
+            return QRadarConnectionTest(
+                success=False,
+                message="Unauthorized - Invalid API token"
+            )
+        else:
+            return QRadarConnectionTest(
+                success=False,
+                message=f"HTTP {response.status_code}"
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return QRadarConnectionTest(
-                    success=True,
-                    message="Connection successful",
-                    version=data.get("external_version", "Unknown")
-                )
-            elif response.status_code == 401:
-                return QRadarConnectionTest(
-                    success=False,
-                    message="Unauthorized - Invalid API token"
-                )
-            else:
-                return QRadarConnectionTest(
-                    success=False,
-                    message=f"HTTP {response.status_code}"
-                )
     except httpx.ConnectError as e:
         error_str = str(e).lower()
         if "ssl" in error_str or "certificate" in error_str:
@@ -148,14 +181,21 @@ async def create_model(model: LLMModelCreate):
     """Create a new LLM model configuration."""
     model_data = model.model_dump()
     model_data["id"] = str(uuid.uuid4())
-    return config_store.save_llm_model(model_data)
+    return JSONResponse(config_store.save_llm_model(model_data))
+
+
+@router.post("/models/activate", response_model=LLMModel)
+async def activate_model(model: LLMModelCreate):
+    """Set the default LLM model, creating it if its model_id isn't configured yet."""
+    model_data = model.model_dump()
+    model_data["id"] = str(uuid.uuid4())
+    return JSONResponse(config_store.activate_llm_model(model_data))
 
 
 @router.get("/models/{model_id}", response_model=LLMModel)
 async def get_model(model_id: str):
     """Get a specific LLM model."""
-    models = config_store.get_llm_models()
-    model = next((m for m in models if m["id"] == model_id), None)
+    model = config_store.get_llm_model(model_id)
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
     return model
@@ -166,7 +206,7 @@ async def update_model(model_id: str, model: LLMModelCreate):
     """Update an LLM model configuration."""
     model_data = model.model_dump()
     model_data["id"] = model_id
-    return config_store.save_llm_model(model_data)
+    return JSONResponse(config_store.save_llm_model(model_data))
 
 
 @router.delete("/models/{model_id}")
@@ -1,19 +1,150 @@
 """MCP router - manages MCP server Docker containers."""
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+import asyncio
+import httpx
 import uuid
 import subprocess
 import json
+import logging
+from functools import lru_cache
 from typing import Optional
 
+from app.config import settings
 from app.models.schemas import MCPServerCreate, MCPServer, MCPServerStatus, MCPTool
 from app import config_store
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Pooled client for MCP server health probes (created lazily)
+_HEALTH_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30)
+# Fail fast on unreachable peers so one dead server doesn't stall the request
+_HEALTH_TIMEOUT = httpx.Timeout(
+    10.0,
+    connect=settings.health_check_connect_timeout,
+    read=settings.health_check_read_timeout,
+)
+_HEALTH_RETRY_DELAY = 0.25  # seconds, doubled per retry
+_http_client: Optional[httpx.AsyncClient] = None
 
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client for health probes."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(timeout=_HEALTH_TIMEOUT, limits=_HEALTH_LIMITS)
+    return _http_client
+
+
+# Health URLs that rejected HEAD - probed with a ranged GET from then on
+_head_unsupported: set[str] = set()
+
+
+async def _health_status(server_url: str, force: bool = False) -> Optional[int]:
+    """Probe an MCP server's /health endpoint and return the HTTP status code.
+    
+    Returns None without probing when health checks are set to "skip", so the
+    caller keeps the stored status. force=True probes anyway (with GET).
+    """
+    if settings.health_check_method == "skip" and not force:
+        return None
+    
+    # Retry briefly while the server reports itself temporarily unavailable
+    delay = _HEALTH_RETRY_DELAY
+    status_code = await _probe_health(server_url)
+    for _ in range(settings.health_check_retries):
+        if status_code != 503:
+            break
+        await asyncio.sleep(delay)
+        delay *= 2
+        status_code = await _probe_health(server_url)
+    return status_code
+
+
+async def _probe_health(server_url: str) -> int:
+    """Send a single health probe using the configured method."""
+    method = settings.health_check_method
+    client = _get_http_client()
+    url = f"{server_url}/health"
+    if method == "head" and url not in _head_unsupported:
+        response = await client.head(url)
+        if response.status_code not in (405, 501):
+            return response.status_code
+        _head_unsupported.add(url)
+    
+    if method == "head":
+        # HEAD not supported - ask for a single byte of the body instead
+        response = await client.get(url, headers={"Range": "bytes=0-0"})
+        return 200 if response.status_code == 206 else response.status_code
+    
+    response = await client.get(url)
+    return response.status_code
+
+
+@router.on_event("shutdown")
+async def _close_http_client():
+    """Stop background status refresh and close the pooled health-probe client."""
+    global _http_client, _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        _refresh_task = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def _run(cmd: list[str], timeout: float, check: bool = False) -> subprocess.CompletedProcess:
+    """Run a command without blocking the event loop (subprocess.run-compatible result)."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    result = subprocess.CompletedProcess(cmd, proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace"))
+    if check:
+        result.check_returncode()
+    return result
+
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected mid-run
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _spawn_background(coro, description: str) -> asyncio.Task:
+    """Run a coroutine in the background, logging (not raising) its failure."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    
+    def _done(t: asyncio.Task):
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.warning(f"Background task '{description}' failed: {t.exception()}")
+    
+    task.add_done_callback(_done)
+    return task
+
+
+# Background `rm -f` per container name, awaited before a container of that name is run again
+_pending_removals: dict[str, asyncio.Task] = {}
+
+
+async def _wait_for_removal(container_name: str) -> None:
+    """Wait for a pending background removal of this container, if any."""
+    task = _pending_removals.pop(container_name, None)
+    if task is not None:
+        # Failures were already logged by _spawn_background
+        await asyncio.gather(task, return_exceptions=True)
+
+
+@lru_cache(maxsize=1)
 def get_container_runtime():
-    """Detect if podman or docker is available."""
+    """Detect if podman or docker is available (cached - installed runtimes don't change)."""
     for runtime in ["podman", "docker"]:
         try:
             result = subprocess.run([runtime, "--version"], capture_output=True, timeout=5)
@@ -24,85 +155,147 @@ def get_container_runtime():
     return "docker"
 
 
-@router.get("/servers", response_model=list[MCPServer])
-async def list_servers():
-    """List all MCP servers."""
-    servers = config_store.get_mcp_servers()
+async def _probe_server(server: dict) -> dict:
+    """Refresh a server's status in place by probing its health endpoint or container."""
+    # Check transport/serverMode
+    is_http_mode = server.get("transport") == "http" or server.get("serverMode") == "http"
+    is_container_mode = not is_http_mode and (server.get("serverMode") == "container" or server.get("containerName"))
     
-    for server in servers:
-        # Check transport/serverMode
-        is_http_mode = server.get("transport") == "http" or server.get("serverMode") == "http"
-        is_container_mode = not is_http_mode and (server.get("serverMode") == "container" or server.get("containerName"))
+    # If user manually disconnected, keep it disconnected
+    if server.get("connected") == False:
+        server["status"] = "stopped"
+        return server
+    
+    if is_http_mode:
+        # For HTTP mode: check if server is reachable
+        server_url = server.get("serverUrl", "http://localhost:8001")
+        try:
+            status_code = await _health_status(server_url)
+            if status_code is not None:
+                server["status"] = "running" if status_code == 200 else "stopped"
+            else:
+                server["status"] = server.get("status", "stopped")
+            server["container_running"] = None  # Not applicable
+        except:
+            server["status"] = "stopped"
+            server["container_running"] = None
+    elif is_container_mode:
+        # For container mode: check if container is running
+        runtime = server.get("containerRuntime") or get_container_runtime()
+        container_name = server.get("containerName") or f"mcp-server-{server.get('id')}"
         
-        # If user manually disconnected, keep it disconnected
-        if server.get("connected") == False:
+        try:
+            result = await _run([runtime, "inspect", "-f", "{{.State.Running}}", container_name], timeout=5)
+            container_running = result.stdout.strip() == "true"
+        except:
+            container_running = False
+        
+        server["container_running"] = container_running
+        if not container_running:
             server["status"] = "stopped"
+    else:
+        # Local process mode
+        server["status"] = server.get("status", "stopped")
+        server["container_running"] = None
+    
+    return server
+
+
+# Last probed status per server id, kept fresh by a background task
+_server_status: dict[str, dict] = {}
+_STATUS_FIELDS = ("status", "container_running")
+# Bumped whenever a server's status is invalidated, so in-flight probes can tell
+_status_generation: dict[str, int] = {}
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def _invalidate_status(server_id: str) -> None:
+    """Forget a server's status and discard any probe of it still in flight."""
+    _server_status.pop(server_id, None)
+    _status_generation[server_id] = _status_generation.get(server_id, 0) + 1
+
+
+async def _refresh_statuses(servers: list[dict]) -> None:
+    """Probe servers concurrently and record their status."""
+    generations = {server["id"]: _status_generation.get(server["id"], 0) for server in servers}
+    # Total time is the slowest probe, not the sum
+    probed = await asyncio.gather(*(_probe_server(server) for server in servers))
+    for server in probed:
+        # Skip results that a start/stop/update made stale while probing
+        if _status_generation.get(server["id"], 0) != generations[server["id"]]:
             continue
-        
-        if is_http_mode:
-            # For HTTP mode: check if server is reachable
-            server_url = server.get("serverUrl", "http://localhost:8001")
-            try:
-                import httpx
-                resp = httpx.get(f"{server_url}/health", timeout=3)
-                server["status"] = "running" if resp.status_code == 200 else "stopped"
-                server["container_running"] = None  # Not applicable
-            except:
-                server["status"] = "stopped"
-                server["container_running"] = None
-        elif is_container_mode:
-            # For container mode: check if container is running
-            runtime = server.get("containerRuntime") or get_container_runtime()
-            container_name = server.get("containerName") or f"mcp-server-{server.get('id')}"
-            
-            try:
-                result = subprocess.run(
-                    [runtime, "inspect", "-f", "{{.State.Running}}", container_name],
-                    capture_output=True, text=True, timeout=5
-                )
-                container_running = result.stdout.strip() == "true"
-            except:
-                container_running = False
-            
-            server["container_running"] = container_running
-            if not container_running:
-                server["status"] = "stopped"
-        else:
-            # Local process mode
-            server["status"] = server.get("status", "stopped")
-            server["container_running"] = None
+        _server_status[server["id"]] = {k: server.get(k) for k in _STATUS_FIELDS}
+
+
+async def _status_refresher():
+    """Periodically re-probe every configured server."""
+    while True:
+        try:
+            servers = [dict(s) for s in config_store.get_snapshot().mcp_servers]
+            await _refresh_statuses(servers)
+        except Exception as e:
+            logger.warning(f"MCP server status refresh failed: {e}")
+        await asyncio.sleep(settings.health_check_interval)
+
+
+@router.on_event("startup")
+async def _start_status_refresher():
+    """Start background status refresh."""
+    global _refresh_task
+    # Runs in "skip" mode too: HTTP servers keep their stored status, but
+    # container state still has to be re-inspected
+    _refresh_task = asyncio.create_task(_status_refresher())
+
+
+@router.get("/servers", response_model=list[MCPServer])
+async def list_servers(refresh: bool = False):
+    """List all MCP servers with their last known status (?refresh=true to probe now)."""
+    servers = config_store.get_mcp_servers()
     
+    # Probe on demand only when asked, or for servers not seen by the refresher yet
+    stale = servers if refresh else [s for s in servers if s["id"] not in _server_status]
+    if stale:
+        await _refresh_statuses(stale)
+    
+    for server in servers:
+        server.update(_server_status.get(server["id"], {}))
     return servers
 
 
 @router.post("/servers", response_model=MCPServer)
 async def create_server(server: MCPServerCreate):
     """Create a new MCP server configuration."""
+    # Body was validated as MCPServerCreate - skip response_model re-validation
     server_data = server.model_dump()
     server_data["id"] = str(uuid.uuid4())
     server_data["status"] = "stopped"
-    return config_store.save_mcp_server(server_data)
+    return JSONResponse(config_store.save_mcp_server(server_data))
 
 
 @router.get("/servers/{server_id}")
 async def get_server(server_id: str):
     """Get a specific MCP server."""
-    servers = config_store.get_mcp_servers()
-    server = next((s for s in servers if s["id"] == server_id), None)
+    server = config_store.get_mcp_server(server_id)
     if not server:
         raise HTTPException(status_code=404, detail="Server not found")
     
+    # If user manually disconnected, report stopped without probing
+    if server.get("connected") is False:
+        server["status"] = "stopped"
+        return server
+    
     # Check status based on transport mode
     transport = server.get("transport", "stdio")
     
     if transport == "http":
         # HTTP mode - check health endpoint
         try:
-            import httpx
             server_url = server.get("serverUrl", "http://localhost:8001")
-            async with httpx.AsyncClient(timeout=3.0) as client:
-                response = await client.get(f"{server_url}/health")
-                server["status"] = "running" if response.status_code == 200 else "stopped"
+            status_code = await _health_status(server_url)
+            if status_code is not None:
+                server["status"] = "running" if status_code == 200 else "stopped"
+            else:
+                server["status"] = server.get("status", "stopped")
         except:
             server["status"] = "stopped"
     else:
@@ -111,9 +304,9 @@ async def get_server(server_id: str):
         container_name = server.get("containerName") or f"mcp-server-{server_id}"
         
         try:
-            result = subprocess.run(
+            result = await _run(
                 [runtime, "inspect", "-f", "{{.State.Running}}", container_name],
-                capture_output=True, text=True, timeout=5
+                timeout=5
             )
             server["status"] = "running" if result.stdout.strip() == "true" else "stopped"
         except:
@@ -125,23 +318,24 @@ async def get_server(server_id: str):
 @router.put("/servers/{server_id}")
 async def update_server(server_id: str, server: MCPServerCreate):
     """Update an MCP server configuration."""
+    _invalidate_status(server_id)
     server_data = server.model_dump()
     server_data["id"] = server_id
-    return config_store.save_mcp_server(server_data)
+    return JSONResponse(config_store.save_mcp_server(server_data))
 
 
 @router.delete("/servers/{server_id}")
 async def delete_server(server_id: str):
     """Delete an MCP server configuration."""
-    servers = config_store.get_mcp_servers()
-    server = next((s for s in servers if s["id"] == server_id), None)
+    _invalidate_status(server_id)
+    server = config_store.get_mcp_server(server_id)
     
     # Only try to stop if it's not using an existing container
     if server and server.get("serverMode") != "container":
         runtime = server.get("containerRuntime") or get_container_runtime()
         container_name = f"mcp-server-{server_id}"
         try:
-            subprocess.run([runtime, "stop", container_name], capture_output=True, timeout=5)
+            await _run([runtime, "stop", container_name], timeout=5)
         except:
             pass
     
@@ -152,8 +346,8 @@ async def delete_server(server_id: str):
 @router.post("/servers/{server_id}/start")
 async def start_server(server_id: str):
     """Start an MCP server - behavior depends on server mode."""
-    servers = config_store.get_mcp_servers()
-    server = next((s for s in servers if s["id"] == server_id), None)
+    _invalidate_status(server_id)
+    server = config_store.get_mcp_server(server_id)
     if not server:
         raise HTTPException(status_code=404, detail="Server not found")
     
@@ -161,16 +355,15 @@ async def start_server(server_id: str):
     if server.get("transport") == "http" or server.get("serverMode") == "http":
         server_url = server.get("serverUrl", "http://localhost:8001")
         try:
-            import httpx
-            async with httpx.AsyncClient(timeout=3.0) as client:
-                response = await client.get(f"{server_url}/health")
-                if response.status_code == 200:
-                    server["status"] = "running"
-                    server["connected"] = True  # Mark as connected
-                    config_store.save_mcp_server(server)
-                    return {"message": "Connected to MCP Server", "status": "running"}
-                else:
-                    raise HTTPException(status_code=500, detail=f"Server returned status {response.status_code}")
+            # Connecting must confirm the server is reachable, even in "skip" mode
+            status_code = await _health_status(server_url, force=True)
+            if status_code == 200:
+                server["status"] = "running"
+                server["connected"] = True  # Mark as connected
+                config_store.save_mcp_server(server)
+                return {"message": "Connected to MCP Server", "status": "running"}
+            else:
+                raise HTTPException(status_code=500, detail=f"Server returned status {status_code}")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Cannot reach server at {server_url}: {str(e)}")
     
@@ -182,9 +375,9 @@ async def start_server(server_id: str):
         
         # Verify container exists and is running
         try:
-            result = subprocess.run(
+            result = await _run(
                 [runtime, "inspect", "-f", "{{.State.Running}}", container_name],
-                capture_output=True, text=True, timeout=5
+                timeout=5
             )
             if result.stdout.strip() == "true":
                 # Container is running - update server status
@@ -193,9 +386,9 @@ async def start_server(server_id: str):
                 return {"message": f"Container '{container_name}' is running", "status": "running"}
             else:
                 # Container exists but not running - start it
-                start_result = subprocess.run(
+                start_result = await _run(
                     [runtime, "start", container_name],
-                    capture_output=True, text=True, timeout=30
+                    timeout=30
                 )
                 if start_result.returncode == 0:
                     server["status"] = "running"
@@ -210,12 +403,14 @@ async def start_server(server_id: str):
     
     # Legacy mode - create new container
     container_name = f"mcp-server-{server_id}"
+    # A stop just before this start may still be removing the old container
+    await _wait_for_removal(container_name)
     
     # Check if already running
     try:
-        result = subprocess.run(
+        result = await _run(
             [runtime, "inspect", "-f", "{{.State.Running}}", container_name],
-            capture_output=True, text=True, timeout=5
+            timeout=5
         )
         if result.stdout.strip() == "true":
             return {"message": "Server already running", "status": "running"}
@@ -244,7 +439,7 @@ async def start_server(server_id: str):
     ]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, check=True)
+        result = await _run(cmd, timeout=30, check=True)
         return {"message": "Server started", "status": "running", "container_id": result.stdout.strip()}
     except subprocess.CalledProcessError as e:
         raise HTTPException(status_code=500, detail=f"Failed to start server: {e.stderr}")
@@ -253,8 +448,8 @@ async def start_server(server_id: str):
 @router.post("/servers/{server_id}/stop")
 async def stop_server(server_id: str):
     """Stop an MCP server - behavior depends on server mode."""
-    servers = config_store.get_mcp_servers()
-    server = next((s for s in servers if s["id"] == server_id), None)
+    _invalidate_status(server_id)
+    server = config_store.get_mcp_server(server_id)
     if not server:
         raise HTTPException(status_code=404, detail="Server not found")
     
@@ -287,13 +482,13 @@ async def stop_server(server_id: str):
     container_name = f"mcp-server-{server_id}"
     
     try:
-        subprocess.run(
+        await _run(
             [runtime, "stop", container_name],
-            capture_output=True, text=True, timeout=10
+            timeout=10
         )
-        subprocess.run(
-            [runtime, "rm", "-f", container_name],
-            capture_output=True, text=True, timeout=5
+        # Container is stopped - remove it in the background instead of making the user wait
+        _pending_removals[container_name] = _spawn_background(
+            _run([runtime, "rm", "-f", container_name], timeout=5), f"rm {container_name}"
         )
         server["status"] = "stopped"
         config_store.save_mcp_server(server)
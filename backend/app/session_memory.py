@@ -9,12 +9,28 @@ Handles:
 - Context-aware responses
 """
 
-import json
 import time
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Deque, Dict, FrozenSet, List, Optional
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import OrderedDict
+from collections import deque
+
+from cachetools import TTLCache
+
+# Argument names excluded from tool cache keys (credentials)
+_CACHE_KEY_EXCLUDED = frozenset({'qradar_token', 'qradar_host', 'token', 'api_key'})
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert a value into a hashable equivalent for cache keys."""
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
 
 
 @dataclass
@@ -25,10 +41,6 @@ class ToolCallRecord:
     result: Any
     timestamp: float
     success: bool
-    
-    def is_expired(self, ttl_seconds: int = 300) -> bool:
-        """Check if this record is older than TTL."""
-        return time.time() - self.timestamp > ttl_seconds
 
 
 @dataclass
@@ -38,6 +50,13 @@ class Exchange:
     assistant_response: str
     tool_calls: List[ToolCallRecord] = field(default_factory=list)
     timestamp: float = field(default_factory=time.time)
+    # Precomputed for duplicate detection
+    normalized: str = field(init=False, repr=False)
+    word_set: FrozenSet[str] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.normalized = self.user_message.lower().strip()
+        self.word_set = frozenset(self.normalized.split())
 
 
 class SessionMemory:
@@ -61,8 +80,12 @@ class SessionMemory:
         self.tool_cache_ttl = tool_cache_ttl
         self.max_cache_size = max_cache_size
         
-        self.exchanges: List[Exchange] = []
-        self.tool_cache: OrderedDict[str, ToolCallRecord] = OrderedDict()
+        # Bounded window - appending past maxlen drops the oldest exchange
+        self.exchanges: Deque[Exchange] = deque(maxlen=max_exchanges)
+        # Normalized user message -> latest exchange, for O(1) exact lookups
+        self._query_index: Dict[str, Exchange] = {}
+        # Expired and overflow entries are evicted by the cache itself
+        self.tool_cache: TTLCache = TTLCache(maxsize=max_cache_size, ttl=tool_cache_ttl)
         self.session_start = time.time()
         self.metadata: Dict[str, Any] = {}
     
@@ -93,11 +116,15 @@ class SessionMemory:
             tool_calls=tool_records
         )
         
-        self.exchanges.append(exchange)
+        # The deque evicts the oldest exchange on append when full
+        if len(self.exchanges) == self.exchanges.maxlen:
+            evicted = self.exchanges[0]
+            # Only drop the index entry if a newer exchange hasn't replaced it
+            if self._query_index.get(evicted.normalized) is evicted:
+                del self._query_index[evicted.normalized]
         
-        # Trim to max size
-        while len(self.exchanges) > self.max_exchanges:
-            self.exchanges.pop(0)
+        self.exchanges.append(exchange)
+        self._query_index[exchange.normalized] = exchange
     
     def _cache_tool_call(self, record: ToolCallRecord):
         """Cache a tool call result."""
@@ -105,17 +132,14 @@ class SessionMemory:
         cache_key = self._make_cache_key(record.tool_name, record.arguments)
         
         self.tool_cache[cache_key] = record
-        
-        # Trim cache if needed
-        while len(self.tool_cache) > self.max_cache_size:
-            self.tool_cache.popitem(last=False)
     
-    def _make_cache_key(self, tool_name: str, arguments: Dict) -> str:
+    def _make_cache_key(self, tool_name: str, arguments: Dict) -> tuple:
         """Create a cache key for a tool call."""
         # Remove credentials from cache key
-        safe_args = {k: v for k, v in arguments.items() 
-                    if k not in ['qradar_token', 'qradar_host', 'token', 'api_key']}
-        return f"{tool_name}:{json.dumps(safe_args, sort_keys=True)}"
+        safe_args = sorted(
+            (k, _freeze(v)) for k, v in arguments.items() if k not in _CACHE_KEY_EXCLUDED
+        )
+        return (tool_name, tuple(safe_args))
     
     def get_cached_result(self, tool_name: str, arguments: Dict) -> Optional[Any]:
         """
@@ -124,16 +148,9 @@ class SessionMemory:
         Returns:
             Cached result or None if not found/expired
         """
-        cache_key = self._make_cache_key(tool_name, arguments)
-        
-        if cache_key in self.tool_cache:
-            record = self.tool_cache[cache_key]
-            if not record.is_expired(self.tool_cache_ttl) and record.success:
-                return record.result
-            else:
-                # Remove expired entry
-                del self.tool_cache[cache_key]
-        
+        record = self.tool_cache.get(self._make_cache_key(tool_name, arguments))
+        if record is not None and record.success:
+            return record.result
         return None
     
     def is_duplicate_query(self, message: str, threshold: float = 0.9) -> Optional[str]:
@@ -145,24 +162,21 @@ class SessionMemory:
         """
         message_lower = message.lower().strip()
         
+        # Exact match via hash lookup - no history scan needed
+        exact = self._query_index.get(message_lower)
+        if exact is not None:
+            return exact.assistant_response
+        
+        words = frozenset(message_lower.split())
         for exchange in reversed(self.exchanges):
-            prev_message = exchange.user_message.lower().strip()
-            
-            # Simple exact match (could be enhanced with fuzzy matching)
-            if message_lower == prev_message:
-                return exchange.assistant_response
-            
             # Check for very similar messages
-            if self._similarity(message_lower, prev_message) >= threshold:
+            if self._similarity(words, exchange.word_set) >= threshold:
                 return exchange.assistant_response
         
         return None
     
-    def _similarity(self, s1: str, s2: str) -> float:
-        """Simple word-based similarity score."""
-        words1 = set(s1.split())
-        words2 = set(s2.split())
-        
+    def _similarity(self, words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+        """Simple word-based (Jaccard) similarity score."""
         if not words1 or not words2:
             return 0.0
         
@@ -183,7 +197,8 @@ class SessionMemory:
         
         lines = ["Previous context:"]
         
-        for i, exchange in enumerate(self.exchanges[-3:], 1):  # Last 3 exchanges
+        last_three = islice(self.exchanges, max(len(self.exchanges) - 3, 0), None)
+        for i, exchange in enumerate(last_three, 1):  # Last 3 exchanges
             user_short = exchange.user_message[:100]
             if len(exchange.user_message) > 100:
                 user_short += "..."
@@ -207,7 +222,7 @@ class SessionMemory:
         summary = {}
         
         for record in self.tool_cache.values():
-            if record.success and not record.is_expired(self.tool_cache_ttl):
+            if record.success:
                 tool_name = record.tool_name
                 if tool_name not in summary:
                     summary[tool_name] = []
@@ -221,6 +236,7 @@ class SessionMemory:
     def clear(self):
         """Clear all memory."""
         self.exchanges.clear()
+        self._query_index.clear()
         self.tool_cache.clear()
         self.session_start = time.time()
         self.metadata.clear()
@@ -237,14 +253,20 @@ class SessionMemory:
 
 
 # Session storage (in production, use Redis or database)
-_sessions: Dict[str, SessionMemory] = {}
+# Bounded and TTL-evicted so idle sessions don't accumulate forever
+SESSION_MAX_COUNT = 10_000
+SESSION_IDLE_TTL = 3600  # seconds
+_sessions: TTLCache = TTLCache(maxsize=SESSION_MAX_COUNT, ttl=SESSION_IDLE_TTL)
 
 
 def get_session(session_id: str) -> SessionMemory:
     """Get or create a session."""
-    if session_id not in _sessions:
-        _sessions[session_id] = SessionMemory()
-    return _sessions[session_id]
+    session = _sessions.get(session_id)
+    if session is None:
+        session = SessionMemory()
+    # (Re)inserting restarts the idle TTL, so active sessions stay alive
+    _sessions[session_id] = session
+    return session
 
 
 def clear_session(session_id: str):
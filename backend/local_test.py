@@ -10,7 +10,7 @@ import os
 # Add app to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.langgraph_agent import LangGraphAgent, MCPClient
+from app.langgraph_agent import LangGraphAgent, MCPClientStdio
 
 # OpenRouter API key (from config)
 OPENROUTER_KEY = "your-openrouter-api-key-here"
@@ -34,78 +34,54 @@ TEST_QUERY = "Get all users from QRadar"
 EXPECTED_WORD = "admin"
 
 
-async def test_model(model_id: str, model_name: str) -> dict:
-    """Test a single model with the MCP agent."""
+def print_header(model_id: str, model_name: str):
+    """Print the banner for a single model's test."""
     print(f"\n{'='*60}")
     print(f"Testing: {model_name} ({model_id})")
     print(f"{'='*60}")
-    
-    # Create MCP client
-    mcp_client = MCPClient(
-        command="python3",
-        args=["-m", "src.server"],
-        env={
-            "QRADAR_HOST": QRADAR_HOST,
-            "QRADAR_API_TOKEN": QRADAR_TOKEN,
-        },
-        cwd=MCP_SERVER_PATH
-    )
-    
-    # Create agent with this model
-    agent = LangGraphAgent(
-        api_key=OPENROUTER_KEY,
-        model_id=model_id,
-        base_url="https://openrouter.ai/api/v1",
-        mcp_client=mcp_client
-    )
-    
+    print(f"  Query: {TEST_QUERY}")
+
+
+async def test_model(agent: LangGraphAgent, model_name: str) -> dict:
+    """Test a single model's agent and report once it has answered."""
     try:
-        # Start agent
-        print("  Starting agent...")
-        await agent.start()
-        
-        # Run query
-        print(f"  Query: {TEST_QUERY}")
         response = await agent.chat(TEST_QUERY)
-        
-        # Analyze response
-        content = response.get("content", "")
-        tools_used = response.get("tools_called", [])
-        
-        has_data = EXPECTED_WORD.lower() in content.lower()
-        has_table = "|" in content
-        used_tools = len(tools_used) > 0
-        
-        print(f"  Response length: {len(content)} chars")
-        print(f"  Tools called: {len(tools_used)}")
-        print(f"  Has expected data: {has_data}")
-        print(f"  Has table: {has_table}")
-        print(f"\n  Preview: {content[:200]}...")
-        
-        if tools_used:
-            print(f"  Tool calls: {[t.get('name') for t in tools_used]}")
-        
-        await agent.stop()
-        
-        return {
-            "model": model_name,
-            "success": has_data,
-            "used_tools": used_tools,
-            "has_table": has_table,
-            "tools": tools_used
-        }
-        
     except Exception as e:
+        print_header(agent.model_id, model_name)
         print(f"  ERROR: {e}")
-        try:
-            await agent.stop()
-        except:
-            pass
         return {
             "model": model_name,
             "success": False,
             "error": str(e)
         }
+    
+    # Models run concurrently - print each report in one go
+    print_header(agent.model_id, model_name)
+    
+    # Analyze response
+    content = response.get("content", "")
+    tools_used = response.get("tools_called", [])
+    
+    has_data = EXPECTED_WORD.lower() in content.lower()
+    has_table = "|" in content
+    used_tools = len(tools_used) > 0
+    
+    print(f"  Response length: {len(content)} chars")
+    print(f"  Tools called: {len(tools_used)}")
+    print(f"  Has expected data: {has_data}")
+    print(f"  Has table: {has_table}")
+    print(f"\n  Preview: {content[:200]}...")
+    
+    if tools_used:
+        print(f"  Tool calls: {[t.get('name') for t in tools_used]}")
+    
+    return {
+        "model": model_name,
+        "success": has_data,
+        "used_tools": used_tools,
+        "has_table": has_table,
+        "tools": tools_used
+    }
 
 
 async def main():
@@ -115,11 +91,39 @@ async def main():
 ╚══════════════════════════════════════════════════════════════╝
 """)
     
+    # One MCP server process shared by every model's agent
+    mcp_client = MCPClientStdio(
+        command="python3",
+        args=["-m", "src.server"],
+        env={
+            "QRADAR_HOST": QRADAR_HOST,
+            "QRADAR_API_TOKEN": QRADAR_TOKEN,
+        },
+        cwd=MCP_SERVER_PATH
+    )
+    
+    agent = LangGraphAgent(
+        api_key=OPENROUTER_KEY,
+        model_id=MODELS[0][0],
+        base_url="https://openrouter.ai/api/v1",
+        mcp_client=mcp_client
+    )
+    
     results = []
     
-    for model_id, model_name in MODELS:
-        result = await test_model(model_id, model_name)
-        results.append(result)
+    try:
+        print("Starting agent...")
+        await agent.start()
+        
+        # One agent per model on the shared MCP client, so LLM calls overlap
+        results = await asyncio.gather(*(
+            test_model(agent.for_model(model_id), model_name)
+            for model_id, model_name in MODELS
+        ))
+    except Exception as e:
+        print(f"Agent error: {e}")
+    finally:
+        await agent.stop()
     
     # Summary
     print("\n" + "=" * 60)
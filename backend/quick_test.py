@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 """Quick multi-model test for IBM MCP"""
+import re
 import requests
 import time
 import sys
 
-API = "http://9.30.147.112:8000/api"
+from api_helpers import API, SESSION, stream_chat, wait_for_default
+
 QUERY = "Get all users from QRadar"
+USERS_RE = re.compile(r"admin|user", re.I)
 
 models = [
     ("Claude 4.5", "anthropic/claude-sonnet-4.5"),
@@ -25,14 +28,14 @@ for name, model_id in models:
     sys.stdout.flush()
     
     try:
-        resp = requests.get(f"{API}/connections/models", timeout=10)
+        resp = SESSION.get(f"{API}/connections/models", timeout=10)
         existing = resp.json()
         
         found = False
         for m in existing:
             if m.get("model_id") == model_id:
                 m["is_default"] = True
-                requests.put(f"{API}/connections/models/{m['id']}", json=m, timeout=10)
+                SESSION.put(f"{API}/connections/models/{m['id']}", json=m, timeout=10)
                 found = True
                 break
         
@@ -41,27 +44,19 @@ for name, model_id in models:
             results.append((name, "NOT CONFIGURED", 0))
             continue
             
-        time.sleep(3)
+        if not wait_for_default(model_id):
+            print(f"  Default model not updated, testing anyway")
         
-        start = time.time()
-        resp = requests.post(
-            f"{API}/chat/", 
-            json={"message": QUERY, "chat_id": f"test-{name.replace(' ','-')}-{int(time.time())}"}, 
-            timeout=120
-        )
-        elapsed = time.time() - start
+        start = time.monotonic()
+        content = stream_chat(QUERY)
+        elapsed = time.monotonic() - start
         
-        if resp.status_code == 200:
-            content = resp.json()["message"]["content"]
-            has_table = "|" in content
-            has_users = "admin" in content.lower() or "user" in content.lower()
-            print(f"  SUCCESS ({elapsed:.1f}s)")
-            print(f"  Table: {has_table}, Users: {has_users}")
-            print(f"  Response: {content[:120]}...")
-            results.append((name, "SUCCESS", elapsed))
-        else:
-            print(f"  FAILED: HTTP {resp.status_code}")
-            results.append((name, "HTTP ERROR", 0))
+        has_table = "|" in content
+        has_users = bool(USERS_RE.search(content))
+        print(f"  SUCCESS ({elapsed:.1f}s)")
+        print(f"  Table: {has_table}, Users: {has_users}")
+        print(f"  Response: {content[:120]}...")
+        results.append((name, "SUCCESS", elapsed))
             
     except requests.Timeout:
         print(f"  TIMEOUT")
@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 """Test suite for IBM MCP Agent with Claude 3.5 Sonnet."""
 
-import requests
+import asyncio
+import httpx
 import json
-import time
+import re
 from datetime import datetime
 
 API_URL = "http://9.30.147.112:8000/api/chat/"
 
+# All queries go out in one batch so the server sets up its MCP connections once
+BATCH_URL = f"{API_URL}batch"
+
+# Words that indicate tools were used
+TOOL_USE_RE = re.compile(r"qradar_|retrieved|fetched|found", re.I)
+
 # Test queries inspired by Claude 4.5 capabilities
 TEST_QUERIES = [
     # Basic data retrieval
@@ -40,48 +47,41 @@ TEST_QUERIES = [
     "Show me the reference data sets",
 ]
 
-def test_query(query, test_num):
-    """Test a single query and analyze response."""
+# The server caps each batch message at 60s, so even one at a time the batch ends by then
+BATCH_TIMEOUT = 60.0 * len(TEST_QUERIES) + 30.0
+
+def print_header(query, test_num):
+    """Print the banner for a single test."""
     print(f"\n{'='*80}")
     print(f"TEST #{test_num}: {query}")
     print(f"{'='*80}")
+
+def check_result(query, test_num, result):
+    """Report a single query's result from the batch and analyze response."""
+    print_header(query, test_num)
     
-    chat_id = f"test-{int(time.time())}-{test_num}"
-    
-    try:
-        response = requests.post(
-            API_URL,
-            json={"message": query, "chat_id": chat_id},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            content = data['message']['content']
-            
-            # Analyze response
-            has_table = '|' in content
-            has_tool_use = 'qradar_' in content.lower() or any(word in content.lower() for word in ['retrieved', 'fetched', 'found'])
-            word_count = len(content.split())
-            
-            print(f"\n✅ Response ({word_count} words):")
-            print(content[:500] + "..." if len(content) > 500 else content)
-            
-            print(f"\n📊 Analysis:")
-            print(f"  • Used tools: {'✓' if has_tool_use else '✗'}")
-            print(f"  • Has table: {'✓' if has_table else '✗'}")
-            print(f"  • Response length: {word_count} words")
-            
-            return True
-        else:
-            print(f"❌ HTTP {response.status_code}: {response.text[:200]}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error: {e}")
+    if "error" in result:
+        print(f"❌ Error: {result['error'][:200]}")
         return False
+    
+    content = result['content']
+    
+    # Analyze response
+    has_table = '|' in content
+    has_tool_use = bool(TOOL_USE_RE.search(content))
+    word_count = len(content.split())
+    
+    print(f"\n✅ Response ({word_count} words):")
+    print(content[:500] + "..." if len(content) > 500 else content)
+    
+    print(f"\n📊 Analysis:")
+    print(f"  • Used tools: {'✓' if has_tool_use else '✗'}")
+    print(f"  • Has table: {'✓' if has_table else '✗'}")
+    print(f"  • Response length: {word_count} words")
+    
+    return True
 
-def main():
+async def main():
     """Run all tests."""
     print(f"\n{'#'*80}")
     print(f"# IBM MCP Agent Test Suite")
@@ -91,15 +91,23 @@ def main():
     print(f"# Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'#'*80}")
     
-    passed = 0
-    failed = 0
+    # Nothing is sent until the whole batch finishes; slow queries come back as errors
+    async with httpx.AsyncClient(timeout=httpx.Timeout(BATCH_TIMEOUT, connect=5.0)) as client:
+        try:
+            response = await client.post(BATCH_URL, json={"messages": TEST_QUERIES})
+            response.raise_for_status()
+            data = response.json()
+            results = data.get("results") or [{"error": data.get("error", "No results")}] * len(TEST_QUERIES)
+        except Exception as e:
+            results = [{"error": str(e)}] * len(TEST_QUERIES)
+    
+    outcomes = [
+        check_result(query, i, result)
+        for i, (query, result) in enumerate(zip(TEST_QUERIES, results), 1)
+    ]
     
-    for i, query in enumerate(TEST_QUERIES, 1):
-        if test_query(query, i):
-            passed += 1
-        else:
-            failed += 1
-        time.sleep(2)  # Rate limiting
+    passed = sum(outcomes)
+    failed = len(outcomes) - passed
     
     print(f"\n{'#'*80}")
     print(f"# RESULTS")
@@ -109,4 +117,4 @@ def main():
     print(f"Success Rate: {(passed/len(TEST_QUERIES)*100):.1f}%")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
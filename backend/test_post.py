@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
-"""Test MCP Agent with POST/DELETE operations"""
+"""Test MCP Agent with POST/DELETE operations
+
+Usage: test_post.py [MODEL_ID[,MODEL_ID...]] [NAME]
+Several comma-separated models are tested one after another on one MCP server.
+"""
 import asyncio
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.langgraph_agent import LangGraphAgent, MCPClient
+from app.langgraph_agent import LangGraphAgent, MCPClientStdio
 
 # Test queries including POST operations
 TEST_QUERIES = [
@@ -23,63 +27,40 @@ TEST_QUERIES = [
     ("Check deployment status", "status", "GET/POST"),
 ]
 
-async def test_model_comprehensive(model_id, model_name):
+async def test_model_comprehensive(agent, model_id, model_name):
     print(f"\n{'='*70}")
     print(f"COMPREHENSIVE TEST: {model_name}")
     print(f"{'='*70}")
     
-    mcp_client = MCPClient(
-        command="python3",
-        args=["-m", "src.server"],
-        env={
-            "QRADAR_HOST": "https://useast.services.cloud.techzone.ibm.com:23768",
-            "QRADAR_API_TOKEN": "your-qradar-api-token-here",
-        },
-        cwd="/Users/anujshrivastava/code/QRadar-MCP/QRadar-MCP-Server"
-    )
-    
-    agent = LangGraphAgent(
-        api_key="your-openrouter-api-key-here",
-        model_id=model_id,
-        base_url="https://openrouter.ai/api/v1",
-        mcp_client=mcp_client
-    )
+    # Swap the LLM only - the MCP server and its tools are reused
+    agent.set_model(model_id)
     
     results = []
     
-    try:
-        await agent.start()
-        print(f"Agent started!\n")
-        
-        for query, expected, op_type in TEST_QUERIES:
-            print(f"[{op_type}] {query}")
-            try:
-                response = await agent.chat(query)
-                content = response.get("content", "").lower()
-                tools = response.get("tools_called", [])
-                
-                has_expected = expected.lower() in content
-                success = has_expected or "error" not in content[:100].lower()
-                
-                status = "✅" if success else "❌"
-                print(f"  {status} Response: {len(content)} chars, Tools: {len(tools)}")
-                print(f"     Preview: {content[:100]}...")
-                
-                results.append({
-                    "query": query,
-                    "type": op_type,
-                    "success": success,
-                    "has_expected": has_expected
-                })
-                
-            except Exception as e:
-                print(f"  ❌ Error: {str(e)[:50]}")
-                results.append({"query": query, "type": op_type, "success": False, "error": str(e)})
-        
-        await agent.stop()
-        
-    except Exception as e:
-        print(f"Agent error: {e}")
+    for query, expected, op_type in TEST_QUERIES:
+        print(f"[{op_type}] {query}")
+        try:
+            response = await agent.chat(query)
+            content = response.get("content", "").lower()
+            tools = response.get("tools_called", [])
+            
+            has_expected = expected.lower() in content
+            success = has_expected or "error" not in content[:100].lower()
+            
+            status = "✅" if success else "❌"
+            print(f"  {status} Response: {len(content)} chars, Tools: {len(tools)}")
+            print(f"     Preview: {content[:100]}...")
+            
+            results.append({
+                "query": query,
+                "type": op_type,
+                "success": success,
+                "has_expected": has_expected
+            })
+            
+        except Exception as e:
+            print(f"  ❌ Error: {str(e)[:50]}")
+            results.append({"query": query, "type": op_type, "success": False, "error": str(e)})
     
     # Summary
     print(f"\n{'='*70}")
@@ -98,11 +79,38 @@ async def test_model_comprehensive(model_id, model_name):
     return results
 
 async def main():
-    # Test with just one model for now (Claude 4.5)
-    model_id = sys.argv[1] if len(sys.argv) > 1 else "anthropic/claude-sonnet-4.5"
-    model_name = sys.argv[2] if len(sys.argv) > 2 else model_id
+    model_ids = (sys.argv[1] if len(sys.argv) > 1 else "anthropic/claude-sonnet-4.5").split(",")
+    name = sys.argv[2] if len(sys.argv) > 2 else None
+    
+    # MCP server and agent are started once and shared across models
+    mcp_client = MCPClientStdio(
+        command="python3",
+        args=["-m", "src.server"],
+        env={
+            "QRADAR_HOST": "https://useast.services.cloud.techzone.ibm.com:23768",
+            "QRADAR_API_TOKEN": "your-qradar-api-token-here",
+        },
+        cwd="/Users/anujshrivastava/code/QRadar-MCP/QRadar-MCP-Server"
+    )
     
-    await test_model_comprehensive(model_id, model_name)
+    agent = LangGraphAgent(
+        api_key="your-openrouter-api-key-here",
+        model_id=model_ids[0],
+        base_url="https://openrouter.ai/api/v1",
+        mcp_client=mcp_client
+    )
+    
+    try:
+        await agent.start()
+        print(f"Agent started!\n")
+        
+        for model_id in model_ids:
+            model_name = name if name and len(model_ids) == 1 else model_id
+            await test_model_comprehensive(agent, model_id, model_name)
+    except Exception as e:
+        print(f"Agent error: {e}")
+    finally:
+        await agent.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
 """Test suite for IBM MCP Chat with various query types."""
 
-import requests
+import asyncio
+import httpx
 import json
+import re
 import time
 from datetime import datetime
 
 BASE_URL = "http://9.30.147.112:8000/api/chat/"
 
+# All queries go out in one batch; the server runs them concurrently on one MCP setup
+BATCH_URL = f"{BASE_URL}batch"
+
+# Response checks, compiled once
+TOOL_USE_RE = re.compile(r"qradar_", re.I)
+REFUSAL_RE = re.compile(r"cannot|limited", re.I)
+
 TEST_QUERIES = [
     # Simple data retrieval
     "Get all users from QRadar",
@@ -40,66 +49,43 @@ TEST_QUERIES = [
     "How do I create a reference set?",
 ]
 
-def test_query(query: str, test_num: int):
-    """Test a single query and return results."""
-    chat_id = f"test-{int(time.time())}-{test_num}"
-    
+# The server caps each batch message at 60s, so even one at a time the batch ends by then
+BATCH_TIMEOUT = 60.0 * len(TEST_QUERIES) + 30.0
+
+def print_report(result: dict, test_num: int):
+    """Print the report for a single test."""
     print(f"\n{'='*80}")
-    print(f"Test {test_num}: {query}")
+    print(f"Test {test_num}: {result['query']}")
     print(f"{'='*80}")
     
-    start_time = time.time()
-    
-    try:
-        response = requests.post(
-            BASE_URL,
-            json={"message": query, "chat_id": chat_id},
-            timeout=30
-        )
-        
-        elapsed = time.time() - start_time
-        
-        if response.status_code == 200:
-            data = response.json()
-            content = data.get("message", {}).get("content", "")
-            
-            # Check if tools were used
-            used_tools = "✓ Used tools" if "qradar_" in content.lower() or len(content) > 200 else "✗ No tools used"
-            
-            print(f"Status: ✓ SUCCESS ({elapsed:.2f}s)")
-            print(f"Tools: {used_tools}")
-            print(f"Response length: {len(content)} chars")
-            print(f"\nResponse preview:")
-            print(content[:300] + ("..." if len(content) > 300 else ""))
-            
-            return {
-                "query": query,
-                "success": True,
-                "elapsed": elapsed,
-                "used_tools": "qradar_" in content.lower() or len(content) > 200,
-                "length": len(content),
-                "refused": "cannot" in content.lower() or "limited" in content.lower()
-            }
-        else:
-            print(f"Status: ✗ FAILED ({response.status_code})")
-            print(f"Error: {response.text[:200]}")
-            return {
-                "query": query,
-                "success": False,
-                "elapsed": elapsed,
-                "error": response.status_code
-            }
-            
-    except Exception as e:
+    if result["success"]:
+        content = result["content"]
+        print(f"Status: ✓ SUCCESS")
+        print(f"Tools: {'✓ Used tools' if result['used_tools'] else '✗ No tools used'}")
+        print(f"Response length: {result['length']} chars")
+        print(f"\nResponse preview:")
+        print(content[:300] + ("..." if len(content) > 300 else ""))
+    else:
         print(f"Status: ✗ ERROR")
-        print(f"Exception: {str(e)[:200]}")
-        return {
-            "query": query,
-            "success": False,
-            "error": str(e)
-        }
+        print(f"Error: {result['error'][:200]}")
 
-def run_tests():
+def check_result(query: str, item: dict) -> dict:
+    """Turn one batch result into a test result."""
+    if "error" in item:
+        return {"query": query, "success": False, "error": item["error"]}
+    
+    content = item.get("content", "")
+    return {
+        "query": query,
+        "success": True,
+        "content": content,
+        # Check if tools were used
+        "used_tools": len(content) > 200 or bool(TOOL_USE_RE.search(content)),
+        "length": len(content),
+        "refused": bool(REFUSAL_RE.search(content))
+    }
+
+async def run_tests():
     """Run all test queries."""
     print(f"\n{'#'*80}")
     print(f"# IBM MCP Chat Test Suite")
@@ -107,12 +93,24 @@ def run_tests():
     print(f"# Total queries: {len(TEST_QUERIES)}")
     print(f"{'#'*80}")
     
-    results = []
+    start_time = time.monotonic()
+    
+    # Nothing is sent until the whole batch finishes; slow queries come back as errors
+    async with httpx.AsyncClient(timeout=httpx.Timeout(BATCH_TIMEOUT, connect=5.0)) as client:
+        try:
+            response = await client.post(BATCH_URL, json={"messages": TEST_QUERIES})
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+            data = response.json()
+            items = data.get("results") or [{"error": data.get("error", "No results")}] * len(TEST_QUERIES)
+        except Exception as e:
+            items = [{"error": str(e)}] * len(TEST_QUERIES)
     
-    for i, query in enumerate(TEST_QUERIES, 1):
-        result = test_query(query, i)
-        results.append(result)
-        time.sleep(1)  # Rate limiting
+    elapsed = time.monotonic() - start_time
+    results = [check_result(query, item) for query, item in zip(TEST_QUERIES, items)]
+    
+    for i, result in enumerate(results, 1):
+        print_report(result, i)
     
     # Summary
     print(f"\n{'#'*80}")
@@ -122,12 +120,11 @@ def run_tests():
     successful = sum(1 for r in results if r.get("success"))
     used_tools = sum(1 for r in results if r.get("used_tools"))
     refused = sum(1 for r in results if r.get("refused"))
-    avg_time = sum(r.get("elapsed", 0) for r in results if r.get("success")) / max(successful, 1)
     
     print(f"Success rate: {successful}/{len(results)} ({successful/len(results)*100:.1f}%)")
     print(f"Tool usage: {used_tools}/{successful} ({used_tools/max(successful,1)*100:.1f}%)")
     print(f"Refusals: {refused}/{successful} ({refused/max(successful,1)*100:.1f}%)")
-    print(f"Avg response time: {avg_time:.2f}s")
+    print(f"Batch time: {elapsed:.2f}s")
     
     # Detailed results
     print(f"\n{'='*80}")
@@ -142,4 +139,4 @@ def run_tests():
     return results
 
 if __name__ == "__main__":
-    results = run_tests()
+    results = asyncio.run(run_tests())
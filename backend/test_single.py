@@ -1,16 +1,39 @@
 #!/usr/bin/env python3
-"""Quick single model test for MCP Agent"""
+"""Quick single model test for MCP Agent
+
+Usage: test_single.py [--no-cache] [MODEL_ID[,MODEL_ID...]] [NAME]
+Several comma-separated models share one MCP server startup.
+Responses are cached in .agent_cache for an hour, and rephrasings of a cached
+query ("list the users" / "show me all users") reuse its answer; --no-cache bypasses both.
+Extra comma-separated keys in OPENROUTER_EXTRA_KEYS spread calls over more rate limits.
+"""
 import asyncio
+import re
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.langgraph_agent import LangGraphAgent, MCPClient
+from app.langgraph_agent import LangGraphAgent, MCPClientStdio
 
-async def test_one_model(model_id, model_name):
-    print(f"Testing {model_name}...")
-    
-    mcp_client = MCPClient(
+# (query, pattern the response must contain)
+PROBES = [
+    ("Get all QRadar users", re.compile(r"\badmin\b", re.I)),
+    ("List offenses", re.compile(r"offense", re.I)),
+    ("Show rules", re.compile(r"rule", re.I)),
+]
+
+# A markdown table row starts with a pipe
+TABLE_RE = re.compile(r"^\s*\|", re.M)
+
+# Only the start of a response is scanned - long tables repeat the same content
+SCAN_CHARS = 32_768
+
+# Concurrent chats allowed per OpenRouter key
+CONCURRENCY_PER_KEY = 4
+
+async def start_agent(model_id):
+    """Start the MCP server and an agent for the first model."""
+    mcp_client = MCPClientStdio(
         command="python3",
         args=["-m", "src.server"],
         env={
@@ -19,40 +42,97 @@ async def test_one_model(model_id, model_name):
         },
         cwd="/Users/anujshrivastava/code/QRadar-MCP/QRadar-MCP-Server"
     )
-    
+
     agent = LangGraphAgent(
         api_key="your-openrouter-api-key-here",
         model_id=model_id,
         base_url="https://openrouter.ai/api/v1",
-        mcp_client=mcp_client
+        providers=[
+            (key, "https://openrouter.ai/api/v1")
+            for key in os.environ.get("OPENROUTER_EXTRA_KEYS", "").split(",") if key
+        ],
+        pool_size=CONCURRENCY_PER_KEY,
+        mcp_client=mcp_client,
+        response_cache_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".agent_cache"),
+        # Jaccard on the prompt's terms: short prompts only match with identical terms
+        semantic_cache_threshold=0.9
     )
-    
+    await agent.start()
+    return agent
+
+async def test_one_model(agent, model_name):
+    """Run the probes for one model; diagnostics are printed later by print_diagnostics."""
+    print(f"Testing {model_name}...")
+
     try:
-        await agent.start()
-        print(f"  Agent started, sending query...")
-        
-        response = await agent.chat("Get all QRadar users")
+        print(f"  Agent started, sending {len(PROBES)} queries...")
+
+        # Probes are independent, so they run concurrently on the one agent
+        responses = await agent.chat_batch(
+            [query for query, _ in PROBES],
+            max_concurrency=CONCURRENCY_PER_KEY * len(agent.providers)
+        )
+    except Exception as e:
+        print(f"  ❌ Error: {e}")
+        return model_name, None
+
+    passed = sum(
+        "error" not in response and bool(expected.search(response.get("content", "")[:SCAN_CHARS]))
+        for (_, expected), response in zip(PROBES, responses)
+    )
+    print(f"  {passed}/{len(PROBES)} queries returned expected data")
+    return model_name, responses
+
+def print_diagnostics(model_name, responses):
+    """Print per-probe details for one model's responses."""
+    print(f"\n{model_name}:")
+    for (query, expected), response in zip(PROBES, responses):
         content = response.get("content", "")
         tools = response.get("tools_called", [])
-        
-        has_admin = "admin" in content.lower()
-        has_table = "|" in content
-        
+
+        head = content[:SCAN_CHARS]
+        has_expected = bool(expected.search(head))
+        has_table = bool(TABLE_RE.search(head))
+
+        print(f"\n  Query: {query}")
+        if "error" in response:
+            print(f"  ❌ Error: {response['error']}")
+            continue
         print(f"  ✅ Response: {len(content)} chars")
         print(f"  Tools called: {len(tools)}")
-        print(f"  Has user data: {has_admin}")
+        print(f"  Has expected data ({expected.pattern}): {has_expected}")
         print(f"  Has table: {has_table}")
         print(f"\n  Preview:\n{content[:400]}...")
-        
-        await agent.stop()
-        return has_admin
-        
+
+def print_all_diagnostics(reports):
+    """Print diagnostics for every model that returned responses."""
+    for model_name, responses in reports:
+        if responses is not None:
+            print_diagnostics(model_name, responses)
+
+async def main(model_ids, name):
+    try:
+        agent = await start_agent(model_ids[0])
     except Exception as e:
         print(f"  ❌ Error: {e}")
-        return False
+        return
+
+    reports = []
+    try:
+        # Later models reuse the running MCP server and its tool list
+        for model_id in model_ids:
+            model_name = name if name and len(model_ids) == 1 else model_id
+            reports.append(await test_one_model(agent.for_model(model_id), model_name))
+    finally:
+        await agent.stop()
+
+    # Printed after shutdown so the details don't interleave with its logging
+    print_all_diagnostics(reports)
 
 if __name__ == "__main__":
-    import sys
-    model_id = sys.argv[1] if len(sys.argv) > 1 else "anthropic/claude-sonnet-4.5"
-    name = sys.argv[2] if len(sys.argv) > 2 else model_id
-    asyncio.run(test_one_model(model_id, name))
+    if "--no-cache" in sys.argv:
+        os.environ["LANGGRAPH_NOCACHE"] = "1"
+    args = [a for a in sys.argv[1:] if a != "--no-cache"]
+    model_ids = (args[0] if args else "anthropic/claude-sonnet-4.5").split(",")
+    name = args[1] if len(args) > 1 else None
+    asyncio.run(main(model_ids, name))